@@ -5,27 +5,106 @@ Following 7D Agile: Discover, Define, Design, Develop, Debug, Deploy, Drive.
 """
 from __future__ import annotations
 
+import gc
+import hashlib
+import importlib.util
+import json
 import logging
 import os
+import re
+import sys
+import threading
+from collections import Counter
+from itertools import groupby
 from textwrap import dedent
-from typing import Optional
+from typing import TYPE_CHECKING, Iterator, Optional
 
 import streamlit as st
 from dotenv import load_dotenv
+from streamlit.runtime.scriptrunner import add_script_run_ctx
 
-from scraper_v2 import get_lyrics_from_input
+from cache import answer_key, answers, interpretation_key, interpretations, resources
+from scraper_v2 import LYRICS_CACHE_TTL_SECONDS, get_lyrics_from_input
 from hardware import detect_hardware, get_compatible_models, get_recommended_model, HardwareSpecs
+from inference_worker import InferenceWorker
+from logging_config import configure as configure_logging
+from local_model import (
+    CALIBRATION_LYRICS,
+    LoadOptions,
+    LocalModel,
+    PromptTemplate,
+    load_cpu_model,
+    load_gguf_model,
+    load_pytorch_model,
+    load_tokenizer,
+)
+
+if TYPE_CHECKING:
+    from groq import Groq
 
-# Load environment variables
-load_dotenv()
+# Load environment variables from .env once per server process; os.environ keeps them across reruns
+# (load_dotenv returns a bool, so the registry caches the result even when there is no .env)
+resources.get_or_create(("dotenv",), load_dotenv)
 
 APP_NAME = "What Do Those Song Lyrics Mean? v2.0"
+LOGO_PATH = "Gillsystems_logo_with_donation_qrcodes.png"
 GROQ_MODEL_NAME = "llama-3.1-70b-versatile"
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(message)s",
+LOCAL_INTERPRETATION_ERROR = "Error generating interpretation locally."
+LOCAL_ANSWER_ERROR = "Error generating answer locally."
+# Lyrics beyond these lengths are cut before prompting (the local models' context is much smaller)
+GROQ_MAX_LYRICS_TOKENS = 1000
+GROQ_MAX_LYRICS_CHARS = 4000  # fallback budget when tiktoken isn't installed
+LOCAL_MAX_LYRICS_CHARS = 4000  # bounds tokenizer work; the token budget does the real truncation
+LOCAL_INTERPRET_TEMPLATE = PromptTemplate(
+    prefix=(
+        "Analyze these song lyrics and explain:\n"
+        "1. The main theme\n"
+        "2. Key symbolic meanings\n"
+        "3. The emotional message\n"
+        "\n"
+        "Lyrics:\n"
+    ),
+    suffix="\n\nAnalysis:",
 )
+LOCAL_QUESTION_SUFFIX = "\n\nQuestion: {question}\n\nAnswer:"
+
+# System prompts are built once; keeping them byte-identical and first in the message
+# list also lets providers with automatic prefix caching reuse the processed prefix
+INTERPRET_SYSTEM_MSG = dedent(
+    """
+    You are a knowledgeable music analyst who explains song lyrics with depth,
+    cultural context, and empathy. Provide:
+    1. A brief synopsis of the song's theme
+    2. Key symbolic or metaphorical meanings
+    3. The emotional or social message conveyed
+    
+    Keep your response clear, insightful, and under 300 words.
+    """
+).strip()
+COMBINED_SYSTEM_MSG = dedent(
+    """
+    You are a knowledgeable music analyst. Reply with a JSON object with two string fields:
+    "interpretation": a clear, insightful interpretation of the song lyrics (theme, symbolic
+    meanings, emotional message) in under 300 words, and
+    "answer": a concise answer to the user's question, using the lyrics as your primary source.
+    """
+).strip()
+QUESTION_SYSTEM_MSG = dedent(
+    """
+    You are a knowledgeable music analyst. Answer the user's question about the song lyrics provided.
+    Use the lyrics as your primary source. Be concise and helpful.
+    """
+).strip()
+
+# Scraper noise stripped before lyrics are sent for interpretation
+_SECTION_HEADER_RE = re.compile(r"\[[^\]\n]{1,40}\]")
+_METADATA_LINE_RE = re.compile(r"^\d+\s*contributors?\b.*$", re.IGNORECASE)
+# Genius glues its "You might also like" banner onto the next lyric line; only the banner goes
+_RECOMMENDATION_PREFIX_RE = re.compile(r"^you might also like", re.IGNORECASE)
+_EMBED_SUFFIX_RE = re.compile(r"\d*\s*Embed$")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+configure_logging()
 
 # Initialize session state
 if "hardware" not in st.session_state:
@@ -36,33 +115,71 @@ if "model_loaded" not in st.session_state:
     st.session_state.model_loaded = None
 
 
-@st.cache_resource(show_spinner=False)
-def get_groq_client(api_key: Optional[str]):
-    """Initialize Groq client with API key."""
+def _groq_http_client():
+    """One pooled HTTP client shared by every Groq client, whatever the API key."""
+    import httpx
+
+    # Keep connections warm between requests so follow-up calls skip the TCP/TLS handshake;
+    # HTTP/2 multiplexes concurrent sessions' requests over one connection (needs h2).
+    # Short connect/read timeouts make a dead network or bad key fail fast.
+    return resources.get_or_create(
+        ("groq-http",),
+        lambda: httpx.Client(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=8, keepalive_expiry=600),
+            timeout=httpx.Timeout(30.0, connect=3.0),
+        ),
+    )
+
+
+def get_groq_client(api_key: Optional[str]) -> Optional[Groq]:
+    """Initialize Groq client with API key, reusing one client per key over a shared connection pool."""
+    api_key = (api_key or "").strip()
     if not api_key:
         return None
     from groq import Groq
-    return Groq(api_key=api_key)
 
+    # Key the registry on a digest so the raw secret isn't held as a dict key
+    key_digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    return resources.get_or_create(
+        ("groq", key_digest), lambda: Groq(api_key=api_key, http_client=_groq_http_client())
+    )
+
+
+@st.cache_data(show_spinner=False)
+def load_logo() -> bytes:
+    """Read the sidebar logo once instead of from disk on every rerun."""
+    with open(LOGO_PATH, "rb") as f:
+        return f.read()
+
+
+def get_tokenizer(model_id: str):
+    """Load a model's tokenizer once, shared across device and backend reloads."""
+    return resources.get_or_create(("tokenizer", model_id), lambda: load_tokenizer(model_id))
 
-@st.cache_resource(show_spinner=False)
-def load_hf_model(model_id: str, use_gpu: bool = False):
+
+def load_hf_model(model_id: str, options: LoadOptions = LoadOptions()) -> Optional[LocalModel | InferenceWorker]:
     """
-    Load a Hugging Face model for inference.
+    Load a Hugging Face model for inference, once per model and load options per server.
+    On CPU the model is exported to ONNX Runtime with INT8 weights when optimum is installed.
     
     Args:
         model_id: HuggingFace model ID
-        use_gpu: Whether to use GPU if available
+        options: Device, precision and backend choices from the sidebar
         
     Returns:
-        Pipeline object or None
+        LocalModel (or its worker-process proxy) or None
     """
+    return resources.get_or_create(("model", model_id, options), lambda: _build_hf_model(model_id, options))
+
+
+def _build_hf_model(model_id: str, options: LoadOptions) -> Optional[LocalModel | InferenceWorker]:
+    """Load and warm up a local model; see load_hf_model."""
     try:
-        from transformers import pipeline
-        import torch
-        
         device = -1  # CPU default
-        if use_gpu:
+        if options.use_gpu:
+            import torch
+            
             if torch.cuda.is_available():
                 device = 0
                 logging.info(f"Loading {model_id} on CUDA GPU")
@@ -72,34 +189,177 @@ def load_hf_model(model_id: str, use_gpu: bool = False):
         
         if device == -1:
             logging.info(f"Loading {model_id} on CPU")
-        
-        model = pipeline(
-            "text2text-generation",
-            model=model_id,
-            device=device,
-            max_length=512,
-        )
-        logging.info(f"Model {model_id} loaded successfully")
+            calibration_prompts = None
+            if options.static_int8:
+                calibration_prompts = [build_interpret_prompt(lyrics) for lyrics in CALIBRATION_LYRICS]
+            if options.isolated:
+                model = InferenceWorker(model_id, calibration_prompts, options.cpu_engine)
+            else:
+                tokenizer = None if model_id.endswith(".gguf") else get_tokenizer(model_id)
+                model = load_cpu_model(model_id, calibration_prompts, tokenizer, options.cpu_engine)
+        elif model_id.endswith(".gguf"):
+            # Pre-quantized GGUF builds (e.g. Q4_K_M) run on llama.cpp's int4 kernels
+            model = load_gguf_model(model_id, use_gpu=True)
+        else:
+            model = load_pytorch_model(
+                model_id, get_tokenizer(model_id), device, options.precision, options.offload
+            )
+        model.warmup()
+        logging.info(f"Model {model_id} loaded successfully ({model.backend})")
+        _model_load_errors().pop((model_id, options), None)
         return model
     except Exception as e:
+        # May run on the prewarm thread, so no st.* calls here; the foreground caller
+        # reports the failure through model_load_error
         logging.error(f"Failed to load model {model_id}: {e}")
-        st.error(f"Failed to load model: {e}")
+        _model_load_errors()[(model_id, options)] = str(e)
         return None
 
 
-def interpret_lyrics_groq(client, lyrics: str) -> str:
-    """Send lyrics to Groq cloud LLM for interpretation."""
-    system_msg = dedent(
-        """
-        You are a knowledgeable music analyst who explains song lyrics with depth,
-        cultural context, and empathy. Provide:
-        1. A brief synopsis of the song's theme
-        2. Key symbolic or metaphorical meanings
-        3. The emotional or social message conveyed
-        
-        Keep your response clear, insightful, and under 300 words.
-        """
-    ).strip()
+def _model_load_errors() -> dict:
+    """Last load failure per (model_id, options), shared by every session."""
+    return resources.get_or_create(("model-load-errors",), dict)
+
+
+def report_model_load_failure(model_id: str, options: LoadOptions) -> None:
+    """Show why a local model failed to load; call from the script thread only."""
+    error = _model_load_errors().get((model_id, options), "see the server log for details")
+    st.error(f"Failed to load model: {error}")
+
+
+def _model_refs() -> tuple[Counter, threading.Lock]:
+    """Number of sessions currently using each cached model, shared by every session."""
+    return resources.get_or_create(("model-refs",), lambda: (Counter(), threading.Lock()))
+
+
+def use_local_model(model_id: str, options: LoadOptions) -> None:
+    """
+    Record that this session now uses model_id/options. The model it used before is
+    unloaded once no other session uses it, so switching models frees the old one's
+    RAM/VRAM before the next load instead of stacking allocations until OOM, without
+    pulling a model (or its worker process) out from under another session.
+    """
+    key = ("model", model_id, options)
+    previous = st.session_state.get("local_model_key")
+    if previous == key:
+        return
+    refs, lock = _model_refs()
+    with lock:
+        refs[key] += 1
+        st.session_state.local_model_key = key
+        if previous is None:
+            return
+        refs[previous] -= 1
+        if refs[previous] > 0:
+            return
+        del refs[previous]
+        # Discarded under the lock, so no session can pick the model up again before it closes
+        released = resources.discard(lambda k: k == previous)
+    if not released:
+        return
+    for model in released:
+        if isinstance(model, InferenceWorker):
+            model.close()
+    logging.info(f"Released model {previous[1]}, no longer used by any session")
+    del released, model
+    gc.collect()
+    # Only touch CUDA if a model load already imported torch
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+def prewarm_local_model(model_id: str, options: LoadOptions) -> None:
+    """
+    Start loading a local model on a background thread so it is resident by the time
+    the user asks for an interpretation. Runs once per model/options per session.
+    """
+    key = (model_id, options)
+    if st.session_state.get("prewarmed_model") == key:
+        return
+    st.session_state.prewarmed_model = key
+    thread = threading.Thread(target=load_hf_model, args=key, daemon=True)
+    add_script_run_ctx(thread)
+    thread.start()
+
+
+def prewarm_groq_connection(api_key: Optional[str]) -> None:
+    """
+    Open the Groq HTTPS connection on a background thread while lyrics are being scraped,
+    so the interpretation request finds a warm connection in the pool (no DNS/TCP/TLS wait).
+    """
+    client = get_groq_client(api_key)
+    if client is None:
+        return
+    
+    def touch() -> None:
+        try:
+            client.models.list()
+        except Exception as e:
+            logging.debug(f"Groq connection prewarm failed: {e}")
+    
+    threading.Thread(target=touch, daemon=True).start()
+
+
+def _clean_lyrics(text: str) -> str:
+    """
+    Strip scraper noise before interpretation: [Verse]/[Chorus] headers, Genius page
+    chrome ("Contributors", "Embed", "You might also like"), consecutive repeated lines
+    and extra whitespace. Fewer tokens means faster LLM responses. The Genius title
+    header is removed by the scraper, which knows where the lyrics came from.
+    """
+    text = _SECTION_HEADER_RE.sub("", text)
+    lines = (
+        _RECOMMENDATION_PREFIX_RE.sub("", _EMBED_SUFFIX_RE.sub("", _WHITESPACE_RE.sub(" ", line).strip())).strip()
+        for line in text.splitlines()
+    )
+    lines = (line for line in lines if not _METADATA_LINE_RE.match(line))
+    return "\n".join(line for line, _ in groupby(lines)).strip()
+
+
+def clean_current_lyrics() -> str:
+    """
+    Cleaned copy of the current lyrics, computed once per lyrics and kept in session
+    state so the cache key, interpretation and reruns don't redo the regex pass.
+    """
+    lyrics = st.session_state.current_lyrics
+    cached = st.session_state.get("cleaned_lyrics")
+    if cached is None or cached[0] != lyrics:
+        cached = (lyrics, _clean_lyrics(lyrics))
+        st.session_state.cleaned_lyrics = cached
+    return cached[1]
+
+
+def _token_encoding():
+    """tiktoken's cl100k encoding, a close stand-in for Groq's Llama tokenizer; None if not installed."""
+    if importlib.util.find_spec("tiktoken") is None:
+        return None
+    import tiktoken
+
+    return resources.get_or_create(("tiktoken", "cl100k_base"), lambda: tiktoken.get_encoding("cl100k_base"))
+
+
+def truncate_lyrics_groq(lyrics: str) -> str:
+    """
+    Trim lyrics to the Groq prompt budget: by tokens when tiktoken is installed,
+    otherwise by characters, backing up to the last full line.
+    """
+    encoding = _token_encoding()
+    if encoding is not None:
+        token_ids = encoding.encode(lyrics, disallowed_special=())
+        if len(token_ids) <= GROQ_MAX_LYRICS_TOKENS:
+            return lyrics
+        return encoding.decode(token_ids[:GROQ_MAX_LYRICS_TOKENS])
+    
+    if len(lyrics) <= GROQ_MAX_LYRICS_CHARS:
+        return lyrics
+    truncated = lyrics[:GROQ_MAX_LYRICS_CHARS]
+    return truncated.rsplit("\n", 1)[0] if "\n" in truncated else truncated
+
+
+def interpret_lyrics_groq(client: Groq, lyrics: str) -> Iterator[str]:
+    """Stream a Groq cloud LLM interpretation of cleaned lyrics, yielding text chunks as they arrive."""
+    lyrics = truncate_lyrics_groq(lyrics)
     
     try:
         response = client.chat.completions.create(
@@ -107,84 +367,95 @@ def interpret_lyrics_groq(client, lyrics: str) -> str:
             temperature=0.5,
             max_tokens=600,
             messages=[
-                {"role": "system", "content": system_msg},
-                {"role": "user", "content": f"Please interpret these song lyrics:\n\n{lyrics[:4000]}"},
+                {"role": "system", "content": INTERPRET_SYSTEM_MSG},
+                {"role": "user", "content": f"Please interpret these song lyrics:\n\n{lyrics}"},
             ],
+            stream=True,
         )
-        return response.choices[0].message.content.strip()
+        for chunk in response:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
     except Exception as e:
         logging.error(f"Groq API error: {e}")
         raise
 
 
-def interpret_lyrics_local(model, lyrics: str) -> str:
-    """Use local Hugging Face model for interpretation."""
-    prompt = dedent(
-        f"""
-        Analyze these song lyrics and explain:
-        1. The main theme
-        2. Key symbolic meanings
-        3. The emotional message
-        
-        Lyrics:
-        {lyrics[:1500]}
-        
-        Analysis:
-        """
-    ).strip()
+def build_interpret_prompt(lyrics: str) -> str:
+    """Prompt used by local models to interpret lyrics."""
+    return LOCAL_INTERPRET_TEMPLATE.render(lyrics[:LOCAL_MAX_LYRICS_CHARS])
+
+
+def interpret_lyrics_local(model: LocalModel | InferenceWorker, lyrics: str) -> str:
+    """Use local Hugging Face model to interpret cleaned lyrics."""
+    lyrics = lyrics[:LOCAL_MAX_LYRICS_CHARS]
     
     try:
-        result = model(prompt, max_length=512, do_sample=False)
-        return result[0]["generated_text"]
+        return model.generate_from_template(LOCAL_INTERPRET_TEMPLATE, lyrics)
     except Exception as e:
         logging.error(f"Local inference error: {e}")
-        return "Error generating interpretation locally."
+        return LOCAL_INTERPRETATION_ERROR
 
 
-def answer_question_groq(client, lyrics: str, question: str) -> str:
-    """Answer a question about the lyrics using Groq."""
-    system_msg = dedent(
-        """
-        You are a knowledgeable music analyst. Answer the user's question about the song lyrics provided.
-        Use the lyrics as your primary source. Be concise and helpful.
-        """
-    ).strip()
-    
+def answer_question_groq(client: Groq, lyrics: str, question: str) -> Iterator[str]:
+    """Stream a Groq answer to a question about the lyrics, yielding text chunks as they arrive."""
     try:
         response = client.chat.completions.create(
             model=GROQ_MODEL_NAME,
             temperature=0.5,
             max_tokens=400,
             messages=[
-                {"role": "system", "content": system_msg},
-                {"role": "user", "content": f"Lyrics:\n{lyrics[:4000]}\n\nQuestion: {question}"},
+                {"role": "system", "content": QUESTION_SYSTEM_MSG},
+                {"role": "user", "content": f"Lyrics:\n{truncate_lyrics_groq(lyrics)}\n\nQuestion: {question}"},
+            ],
+            stream=True,
+        )
+        for chunk in response:
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+    except Exception as e:
+        logging.error(f"Groq API error: {e}")
+        raise
+
+
+def interpret_and_answer_groq(client: Groq, lyrics: str, question: str) -> tuple[str, str]:
+    """
+    Interpret cleaned lyrics and answer a question about them in a single Groq request,
+    saving a round-trip and a second copy of the lyrics in the prompt.
+    
+    Returns:
+        Tuple of (interpretation, answer)
+    """
+    lyrics = truncate_lyrics_groq(lyrics)
+    
+    try:
+        response = client.chat.completions.create(
+            model=GROQ_MODEL_NAME,
+            temperature=0.5,
+            max_tokens=1000,
+            messages=[
+                {"role": "system", "content": COMBINED_SYSTEM_MSG},
+                {"role": "user", "content": f"Lyrics:\n{lyrics}\n\nQuestion: {question}"},
             ],
+            response_format={"type": "json_object"},
         )
-        return response.choices[0].message.content.strip()
+        result = json.loads(response.choices[0].message.content)
+        return str(result.get("interpretation", "")).strip(), str(result.get("answer", "")).strip()
     except Exception as e:
         logging.error(f"Groq API error: {e}")
         raise
 
 
-def answer_question_local(model, lyrics: str, question: str) -> str:
+def answer_question_local(model: LocalModel | InferenceWorker, lyrics: str, question: str) -> str:
     """Answer a question about the lyrics using local model."""
-    prompt = dedent(
-        f"""
-        Lyrics:
-        {lyrics[:1500]}
-        
-        Question: {question}
-        
-        Answer:
-        """
-    ).strip()
+    template = PromptTemplate(prefix="Lyrics:\n", suffix=LOCAL_QUESTION_SUFFIX.format(question=question))
     
     try:
-        result = model(prompt, max_length=512, do_sample=False)
-        return result[0]["generated_text"]
+        return model.generate_from_template(template, lyrics[:LOCAL_MAX_LYRICS_CHARS], cache_template=False)
     except Exception as e:
         logging.error(f"Local inference error: {e}")
-        return "Error generating answer locally."
+        return LOCAL_ANSWER_ERROR
 
 
 def render_sidebar() -> tuple[Optional[str], str, bool]:
@@ -196,10 +467,13 @@ def render_sidebar() -> tuple[Optional[str], str, bool]:
         if st.button("🖥️ Detect Hardware", use_container_width=True):
             with st.spinner("Detecting hardware..."):
                 st.session_state.hardware = detect_hardware()
+            # The model selector below defaults to the recommended model, and in local mode
+            # main() prewarms (downloads and loads) the selected model later in this same run
+        hardware = st.session_state.hardware
         
-        if st.session_state.hardware:
+        if hardware:
             with st.expander("💻 Hardware Info", expanded=False):
-                st.code(str(st.session_state.hardware), language=None)
+                st.code(str(hardware), language=None)
         
         st.divider()
         
@@ -233,48 +507,86 @@ def render_sidebar() -> tuple[Optional[str], str, bool]:
             st.info("💻 Using local model")
             
             # Model selection for local mode
-            if not st.session_state.hardware:
+            use_gpu = False
+            compatible_models = []
+            if not hardware:
                 st.warning("⚠️ Click 'Detect Hardware' above to see compatible models")
-                compatible_models = []
             else:
-                compatible_models = get_compatible_models(st.session_state.hardware)
-                recommended = get_recommended_model(st.session_state.hardware)
-                
+                # The int8 RAM/VRAM thresholds only apply to bitsandbytes loads on CUDA
+                quantized = (
+                    hardware.has_cuda
+                    and st.session_state.get("use_gpu", True)
+                    and st.session_state.get("gpu_precision", "fp16") in ("int8", "int4")
+                )
+                compatible_models = get_compatible_models(hardware, quantized)
+                recommended = get_recommended_model(hardware, quantized)
                 st.success(f"✓ Recommended: {recommended.model_name}")
             
-            # Model selector
-            if compatible_models:
-                model_options = {
-                    f"{m.model_name} ({m.size_mb}MB)": m.model_id 
-                    for m in compatible_models
-                }
-                
+            if not compatible_models:
+                st.session_state.selected_model = "google/flan-t5-small"
+            else:
+                # Model selector
+                model_options = {f"{m.model_name} ({m.size_mb}MB)": m for m in compatible_models}
+                # Default to the recommended model, so it is the one main() prewarms
                 selected_display = st.selectbox(
                     "Select Model:",
                     options=list(model_options.keys()),
+                    index=list(model_options.values()).index(recommended),
                     help="Models filtered by your hardware"
                 )
-                
-                selected_model_id = model_options[selected_display]
-                st.session_state.selected_model = selected_model_id
+                selected_info = model_options[selected_display]
+                st.session_state.selected_model = selected_info.model_id
                 
                 # Show model details
-                selected_info = next(m for m in compatible_models if m.model_id == selected_model_id)
                 with st.expander("📊 Model Details"):
                     st.write(f"**ID:** `{selected_info.model_id}`")
                     st.write(f"**Size:** {selected_info.size_mb}MB")
                     st.write(f"**Min RAM:** {selected_info.min_ram_gb}GB")
+                    if selected_info.quantized_ram_gb is not None and quantized:
+                        st.write(f"**Min RAM (int8 on GPU):** {selected_info.quantized_ram_gb}GB")
                     st.write(f"**GPU Required:** {'Yes' if selected_info.requires_gpu else 'No'}")
                     st.write(f"**Description:** {selected_info.description}")
                 
                 # GPU toggle if available
-                if st.session_state.hardware.has_cuda or st.session_state.hardware.has_mps:
-                    use_gpu = st.checkbox("Use GPU acceleration", value=True)
-                else:
-                    use_gpu = False
-            else:
-                st.session_state.selected_model = "google/flan-t5-small"
-                use_gpu = False
+                if hardware.has_cuda or hardware.has_mps:
+                    use_gpu = st.checkbox("Use GPU acceleration", value=True, key="use_gpu")
+                    if use_gpu and hardware.has_cuda:
+                        precision = st.radio(
+                            "Precision:",
+                            ["fp16", "int8", "int4"],
+                            key="gpu_precision",
+                            horizontal=True,
+                            help="fp16 loads 16-bit weights (bf16 on Ampere/RTX 30xx and newer). "
+                                 "int8/int4 load weights with bitsandbytes, cutting VRAM 2-4x "
+                                 "so larger models fit on small GPUs."
+                        )
+                        if precision == "fp16":
+                            st.checkbox(
+                                "Layer streaming (large models)",
+                                key="layer_offload",
+                                help="Keep layers that don't fit in VRAM in system RAM and stream "
+                                     "them to the GPU as needed. Slower than full-GPU, faster than CPU."
+                            )
+            
+            if not use_gpu:
+                st.checkbox(
+                    "Fast CPU (CTranslate2)",
+                    key="ctranslate2",
+                    help="Run the model on CTranslate2's fused INT8 kernels "
+                         "(pip install ctranslate2). Converted once on first use."
+                )
+                st.checkbox(
+                    "Static INT8 quantization",
+                    key="static_int8",
+                    help="Calibrate INT8 activations for the encoder on sample lyrics. "
+                         "Faster on CPU; the first load takes longer."
+                )
+                st.checkbox(
+                    "Run model in separate process",
+                    key="isolated_inference",
+                    help="Keep the model out of the Streamlit server process so the UI "
+                         "stays responsive while it generates."
+                )
             
             # HuggingFace model browser
             if st.button("🤗 Browse More Models on HuggingFace", use_container_width=True):
@@ -284,7 +596,8 @@ def render_sidebar() -> tuple[Optional[str], str, bool]:
             custom_model = st.text_input(
                 "Custom Model ID (optional):",
                 placeholder="e.g., google/flan-t5-base",
-                help="Enter any HuggingFace text2text model ID"
+                help="Enter any HuggingFace text2text model ID, or a .gguf file "
+                     "(local path or org/repo/file.gguf) to run with llama.cpp"
             )
             
             if custom_model:
@@ -300,7 +613,7 @@ def render_sidebar() -> tuple[Optional[str], str, bool]:
             st.rerun()
             
         st.divider()
-        st.image("Gillsystems_logo_with_donation_qrcodes.png", use_container_width=True)
+        st.image(load_logo(), use_container_width=True)
         
         return api_key, mode, use_gpu if not use_cloud else False
 
@@ -320,6 +633,21 @@ def main() -> None:
         st.session_state.current_interpretation = None
     
     api_key, mode, use_gpu = render_sidebar()
+    load_options = LoadOptions(
+        use_gpu=use_gpu,
+        static_int8=st.session_state.get("static_int8", False),
+        isolated=st.session_state.get("isolated_inference", False),
+        precision=st.session_state.get("gpu_precision", "fp16"),
+        offload=st.session_state.get("layer_offload", False),
+        cpu_engine="ctranslate2" if st.session_state.get("ctranslate2", False) else "auto",
+    )
+    
+    # Kick off the local model load before any scraping, so the two overlap: by the time
+    # lyrics arrive, load_hf_model below either returns the loaded model or waits on the
+    # in-flight load instead of starting a second one
+    if mode != "Cloud (Groq API)" and st.session_state.selected_model:
+        use_local_model(st.session_state.selected_model, load_options)
+        prewarm_local_model(st.session_state.selected_model, load_options)
 
     st.title(APP_NAME)
     st.markdown(
@@ -338,6 +666,12 @@ def main() -> None:
             key="search_input"
         )
         scrape_button = st.button("🔍 Get Lyrics & Interpret", type="primary", key="scrape_btn")
+        force_refresh = st.checkbox(
+            "Force refresh",
+            key="force_refresh",
+            help="Search again instead of reusing lyrics found for this query in the last "
+                 f"{LYRICS_CACHE_TTL_SECONDS // 86400} days"
+        )
     
     with tab2:
         st.subheader("Paste Lyrics Manually")
@@ -354,8 +688,11 @@ def main() -> None:
     process_interpretation = False
     
     if scrape_button and user_input.strip():
+        if mode == "Cloud (Groq API)":
+            prewarm_groq_connection(api_key)
         with st.spinner("🔎 Searching for lyrics..."):
-            lyrics, status = get_lyrics_from_input(user_input)
+            # Memoized in the scraper per query; failed lookups are retried on the next click
+            lyrics, status = get_lyrics_from_input(user_input, refresh=force_refresh)
         st.info(status)
         
         if lyrics:
@@ -384,7 +721,15 @@ def main() -> None:
             
         # Interpret if requested
         if process_interpretation:
-            if mode == "Cloud (Groq API)":
+            model_name = GROQ_MODEL_NAME if mode == "Cloud (Groq API)" else st.session_state.selected_model
+            cache_key = interpretation_key(model_name or "", clean_current_lyrics())
+            cached_interpretation = interpretations.get(cache_key)
+            
+            if cached_interpretation:
+                st.session_state.current_interpretation = cached_interpretation
+                logging.info(f"Served interpretation for {model_name} from cache")
+            
+            elif mode == "Cloud (Groq API)":
                 if not api_key:
                     st.error("❌ Please enter your Groq API key in the sidebar.")
                     st.info("Get a free key at: https://console.groq.com")
@@ -392,8 +737,15 @@ def main() -> None:
                     with st.spinner("🤖 Generating interpretation with Groq AI..."):
                         try:
                             client = get_groq_client(api_key)
-                            interpretation = interpret_lyrics_groq(client, st.session_state.current_lyrics)
+                            # Render tokens as they arrive, then hand over to the regular display below
+                            stream_box = st.empty()
+                            with stream_box.container():
+                                interpretation = st.write_stream(
+                                    interpret_lyrics_groq(client, clean_current_lyrics())
+                                ).strip()
+                            stream_box.empty()
                             st.session_state.current_interpretation = interpretation
+                            interpretations.put(cache_key, interpretation)
                             logging.info("Successfully interpreted with Groq")
                         except Exception as exc:
                             st.error("❌ Error communicating with Groq API.")
@@ -406,18 +758,22 @@ def main() -> None:
                 else:
                     model_id = st.session_state.selected_model
                     with st.spinner(f"🤖 Loading model: {model_id} (first run may take time)..."):
-                        local_model = load_hf_model(model_id, use_gpu)
+                        local_model = load_hf_model(model_id, load_options)
                     
                     if local_model:
                         with st.spinner("💻 Generating interpretation..."):
                             try:
-                                interpretation = interpret_lyrics_local(local_model, st.session_state.current_lyrics)
+                                interpretation = interpret_lyrics_local(local_model, clean_current_lyrics())
                                 st.session_state.current_interpretation = interpretation
+                                if interpretation != LOCAL_INTERPRETATION_ERROR:
+                                    interpretations.put(cache_key, interpretation)
                                 logging.info(f"Successfully interpreted with {model_id}")
                             except Exception as exc:
                                 st.error("❌ Error with local model.")
                                 st.caption(f"Details: {exc}")
                                 logging.exception("Local model failed")
+                    else:
+                        report_model_load_failure(model_id, load_options)
 
         # Display interpretation if available
         if st.session_state.current_interpretation:
@@ -438,16 +794,43 @@ def main() -> None:
                 if not question.strip():
                     st.warning("Please enter a question.")
                 else:
-                    if mode == "Cloud (Groq API)":
+                    model_name = GROQ_MODEL_NAME if mode == "Cloud (Groq API)" else st.session_state.selected_model
+                    cache_key = answer_key(model_name or "", clean_current_lyrics(), question)
+                    cached_answer = answers.get(cache_key)
+                    
+                    if cached_answer:
+                        # Repeat questions (re-asks, reruns) skip the model entirely
+                        st.markdown("### 🤖 Answer")
+                        st.markdown(cached_answer)
+                        logging.info(f"Served answer for {model_name} from cache")
+                    elif mode == "Cloud (Groq API)":
                         if not api_key:
                             st.error("❌ Please enter your Groq API key in the sidebar.")
                         else:
                             with st.spinner("🤖 Asking Groq AI..."):
                                 try:
                                     client = get_groq_client(api_key)
-                                    answer = answer_question_groq(client, st.session_state.current_lyrics, question)
                                     st.markdown("### 🤖 Answer")
-                                    st.markdown(answer)
+                                    if st.session_state.current_interpretation is None:
+                                        # No interpretation yet - get both from one request
+                                        interpretation, answer = interpret_and_answer_groq(
+                                            client, clean_current_lyrics(), question
+                                        )
+                                        st.markdown(answer)
+                                        if interpretation:
+                                            st.session_state.current_interpretation = interpretation
+                                            interpretations.put(
+                                                interpretation_key(
+                                                    GROQ_MODEL_NAME, clean_current_lyrics()
+                                                ),
+                                                interpretation,
+                                            )
+                                    else:
+                                        answer = st.write_stream(
+                                            answer_question_groq(client, clean_current_lyrics(), question)
+                                        )
+                                    if answer:
+                                        answers.put(cache_key, answer)
                                 except Exception as exc:
                                     st.error("❌ Error communicating with Groq API.")
                                     st.caption(f"Details: {exc}")
@@ -457,17 +840,21 @@ def main() -> None:
                         else:
                             model_id = st.session_state.selected_model
                             with st.spinner(f"🤖 Loading model: {model_id}..."):
-                                local_model = load_hf_model(model_id, use_gpu)
+                                local_model = load_hf_model(model_id, load_options)
                             
                             if local_model:
                                 with st.spinner("💻 Generating answer..."):
                                     try:
-                                        answer = answer_question_local(local_model, st.session_state.current_lyrics, question)
+                                        answer = answer_question_local(local_model, clean_current_lyrics(), question)
                                         st.markdown("### 🤖 Answer")
                                         st.markdown(answer)
+                                        if answer != LOCAL_ANSWER_ERROR:
+                                            answers.put(cache_key, answer)
                                     except Exception as exc:
                                         st.error("❌ Error with local model.")
                                         st.caption(f"Details: {exc}")
+                            else:
+                                report_model_load_failure(model_id, load_options)
     
     # Footer
     st.markdown("---")
@@ -0,0 +1,217 @@
+"""
+In-process caches for expensive results such as LLM interpretations and loaded models.
+Streamlit re-executes app.py on every interaction, so caches live in this module,
+where they survive reruns and are shared by all sessions of the server.
+Interpretations (and the scraper's lyrics and subtitle caches) are also written to a
+SQLite file so they survive server restarts.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+INTERPRETATION_CACHE_SIZE = 500
+ANSWER_CACHE_SIZE = 500
+CACHE_DB_PATH = ".lyrics_cache.db"
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache, with optional expiry of entries."""
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or None on a miss or once the entry has expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        self._store(key, value, time.monotonic())
+
+    def _store(self, key: str, value: Any, stored_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (stored_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        """Remove an entry if present."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class PersistentLRUCache(LRUCache):
+    """
+    LRUCache backed by a SQLite table: misses fall through to disk and puts are written
+    through. With ttl_seconds, entries expire on disk too and expired rows are purged.
+    If the database can't be opened the cache keeps working in memory only.
+    """
+
+    def __init__(self, max_entries: int, db_path: str, table: str, ttl_seconds: Optional[float] = None):
+        super().__init__(max_entries, ttl_seconds)
+        self.db_path = db_path
+        self.table = table
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_failed = False
+        self._db_lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        # Opened on first use, so importing this module never touches the disk
+        if self._conn is None and not self._db_failed:
+            try:
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {self.table} "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL DEFAULT 0)"
+                )
+                try:
+                    # Tables created before entries were timestamped
+                    conn.execute(f"ALTER TABLE {self.table} ADD COLUMN stored_at REAL NOT NULL DEFAULT 0")
+                except sqlite3.OperationalError:
+                    pass
+                conn.commit()
+                self._conn = conn
+            except sqlite3.Error as e:
+                logger.warning(f"Persistent cache {self.db_path} unavailable, caching in memory only: {e}")
+                self._db_failed = True
+        return self._conn
+
+    def _purge_expired(self, conn: sqlite3.Connection) -> None:
+        # Called with _db_lock held; at most once per TTL/24 so writes stay cheap
+        now = time.time()
+        if self.ttl_seconds is None or now - self._last_purge < self.ttl_seconds / 24:
+            return
+        self._last_purge = now
+        conn.execute(f"DELETE FROM {self.table} WHERE stored_at < ?", (now - self.ttl_seconds,))
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value from memory, then disk, or None on a miss or once expired."""
+        value = super().get(key)
+        if value is not None:
+            return value
+        with self._db_lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Persistent cache read failed: {e}")
+                return None
+        if row is None:
+            return None
+        value, stored_at = row
+        age = time.time() - stored_at
+        if self.ttl_seconds is not None and age > self.ttl_seconds:
+            return None
+        # Keep the entry's original age in memory, so it expires when the disk copy does
+        self._store(key, value, time.monotonic() - max(age, 0.0))
+        return value
+
+    def put(self, key: str, value: str) -> None:
+        """Store a value in memory and on disk."""
+        super().put(key, value)
+        with self._db_lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at) VALUES (?, ?, ?)",
+                    (key, value, time.time()),
+                )
+                self._purge_expired(conn)
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Persistent cache write failed: {e}")
+
+    def discard(self, key: str) -> None:
+        """Remove an entry from memory and disk if present."""
+        super().discard(key)
+        with self._db_lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Persistent cache delete failed: {e}")
+
+
+class ResourceRegistry:
+    """
+    Build-once registry for shared resources such as loaded models and API clients.
+    Lookups of existing entries take no lock; a miss locks only its own key, so one
+    slow model load doesn't block unrelated lookups. Failed builds (None) aren't stored.
+    """
+
+    def __init__(self):
+        self._resources: dict[Hashable, Any] = {}
+        self._key_locks: dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return the resource for key, building it with factory on first use."""
+        resource = self._resources.get(key)
+        if resource is not None:
+            return resource
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            resource = self._resources.get(key)
+            if resource is None:
+                resource = factory()
+                if resource is not None:
+                    self._resources[key] = resource
+        return resource
+
+    def discard(self, predicate: Callable[[Hashable], bool]) -> list[Any]:
+        """Remove every resource whose key matches predicate and return the removed resources."""
+        with self._lock:
+            keys = [key for key in self._resources if predicate(key)]
+            for key in keys:
+                self._key_locks.pop(key, None)
+            return [self._resources.pop(key) for key in keys]
+
+
+def interpretation_key(model_name: str, lyrics: str) -> str:
+    """
+    Content-addressed cache key for an interpretation: the model plus a hash of the lyrics.
+    Pass cleaned lyrics so copies that differ only in scraper noise share an entry.
+    """
+    digest = hashlib.blake2b(lyrics.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{model_name}:{digest}"
+
+
+def answer_key(model_name: str, lyrics: str, question: str) -> str:
+    """Cache key for an answer to a question about a song; case and spacing of the question are ignored."""
+    question = " ".join(question.lower().split())
+    return f"{interpretation_key(model_name, lyrics)}:{hashlib.blake2b(question.encode('utf-8'), digest_size=16).hexdigest()}"
+
+
+interpretations = PersistentLRUCache(INTERPRETATION_CACHE_SIZE, CACHE_DB_PATH, "interpretations")
+answers = LRUCache(ANSWER_CACHE_SIZE)
+resources = ResourceRegistry()
@@ -7,9 +7,9 @@ from __future__ import annotations
 import logging
 import platform
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -25,10 +25,15 @@ class HardwareSpecs:
     cuda_version: Optional[str]
     gpu_name: Optional[str]
     gpu_memory_gb: Optional[float]
+    has_avx2: bool = False
+    has_avx512: bool = False
+    has_vnni: bool = False  # AVX512-VNNI or AVX-VNNI int8 dot products
     
     def __str__(self) -> str:
+        simd = [("AVX2", self.has_avx2), ("AVX-512", self.has_avx512), ("VNNI", self.has_vnni)]
+        simd_names = "/".join(name for name, present in simd if present)
         specs = [
-            f"CPU: {self.cpu_name} ({self.cpu_count} cores)",
+            f"CPU: {self.cpu_name} ({self.cpu_count} cores)" + (f" - {simd_names}" if simd_names else ""),
             f"RAM: {self.available_ram_gb:.1f}GB available / {self.total_ram_gb:.1f}GB total",
         ]
         if self.has_cuda:
@@ -43,33 +48,85 @@ class HardwareSpecs:
 def detect_hardware() -> HardwareSpecs:
     """
     Detect system hardware capabilities.
+    GPU details are probed once per process; RAM is re-sampled on every call.
     
     Returns:
         HardwareSpecs object with system information
     """
     import psutil
-    import os
     
     # CPU detection
     cpu_count = psutil.cpu_count(logical=True)
-    cpu_name = platform.processor() or "Unknown CPU"
+    cpu_name, cpu_flags = _cpu_info()
     
     # RAM detection
     ram = psutil.virtual_memory()
     total_ram_gb = ram.total / (1024 ** 3)
     available_ram_gb = ram.available / (1024 ** 3)
     
-    # GPU detection
+    has_cuda, has_mps, cuda_version, gpu_name, gpu_memory_gb = _detect_gpu()
+    
+    return HardwareSpecs(
+        cpu_count=cpu_count,
+        cpu_name=cpu_name,
+        total_ram_gb=total_ram_gb,
+        available_ram_gb=available_ram_gb,
+        has_cuda=has_cuda,
+        has_mps=has_mps,
+        cuda_version=cuda_version,
+        gpu_name=gpu_name,
+        gpu_memory_gb=gpu_memory_gb,
+        has_avx2="avx2" in cpu_flags,
+        has_avx512="avx512f" in cpu_flags,
+        has_vnni=bool(cpu_flags & {"avx512_vnni", "avx512vnni", "avx_vnni", "avxvnni"}),
+    )
+
+
+@lru_cache(maxsize=1)
+def _cpu_info() -> tuple[str, frozenset[str]]:
+    """
+    CPU brand string and feature flags, via py-cpuinfo when installed.
+    platform.processor() is often empty on Linux and reports no SIMD features.
+    
+    Returns:
+        (cpu_name, lowercase feature flags)
+    """
+    try:
+        from cpuinfo import get_cpu_info
+        
+        info = get_cpu_info()
+        return info.get("brand_raw") or platform.processor() or "Unknown CPU", frozenset(info.get("flags", []))
+    except Exception as e:
+        logger.debug(f"py-cpuinfo unavailable, CPU features unknown: {e}")
+        return platform.processor() or "Unknown CPU", frozenset()
+
+
+@lru_cache(maxsize=1)
+def _detect_gpu() -> tuple[bool, bool, Optional[str], Optional[str], Optional[float]]:
+    """
+    Probe for a CUDA or Apple Silicon GPU.
+    The GPU can't change while the app runs, so this runs once: importing torch and
+    initializing CUDA are slow and the CUDA context holds on to memory.
+    
+    Returns:
+        (has_cuda, has_mps, cuda_version, gpu_name, gpu_memory_gb)
+    """
     has_cuda = False
     has_mps = False
     cuda_version = None
     gpu_name = None
     gpu_memory_gb = None
     
-    # Check for CUDA (NVIDIA)
+    # torch is the slowest import in the app; it is only loaded here and on the model-load
+    # path, never on plain reruns
     try:
         import torch
-        if torch.cuda.is_available():
+    except ImportError:
+        torch = None
+    
+    # Check for CUDA (NVIDIA)
+    try:
+        if torch is not None and torch.cuda.is_available():
             has_cuda = True
             cuda_version = torch.version.cuda
             gpu_name = torch.cuda.get_device_name(0)
@@ -80,25 +137,29 @@ def detect_hardware() -> HardwareSpecs:
     
     # Check for MPS (Apple Silicon)
     try:
-        import torch
-        if hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
+        if torch is not None and hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
             has_mps = True
             gpu_name = "Apple Silicon"
             logger.info("Apple Silicon GPU detected")
     except:
         pass
     
-    return HardwareSpecs(
-        cpu_count=cpu_count,
-        cpu_name=cpu_name,
-        total_ram_gb=total_ram_gb,
-        available_ram_gb=available_ram_gb,
-        has_cuda=has_cuda,
-        has_mps=has_mps,
-        cuda_version=cuda_version,
-        gpu_name=gpu_name,
-        gpu_memory_gb=gpu_memory_gb,
-    )
+    return has_cuda, has_mps, cuda_version, gpu_name, gpu_memory_gb
+
+
+def cpu_supports_fp16() -> bool:
+    """
+    Check whether the CPU has native FP16 arithmetic (AVX512-FP16, Sapphire Rapids and newer).
+    Older CPUs emulate FP16 through conversions, which is slower than FP32.
+    """
+    try:
+        try:
+            from numpy._core._multiarray_umath import __cpu_features__
+        except ImportError:
+            from numpy.core._multiarray_umath import __cpu_features__
+    except ImportError:
+        return False
+    return bool(__cpu_features__.get("AVX512FP16") or __cpu_features__.get("AVX512_SPR"))
 
 
 @dataclass
@@ -111,11 +172,24 @@ class ModelRecommendation:
     requires_gpu: bool
     recommended_for: str  # "cpu", "gpu", "high-end"
     description: str
+    quantized_ram_gb: Optional[float] = None  # Min RAM/VRAM when loaded in 8-bit on a CUDA GPU
     
-    def is_compatible(self, hardware: HardwareSpecs) -> bool:
-        """Check if model is compatible with hardware."""
-        # Check RAM requirement
-        if hardware.available_ram_gb < self.min_ram_gb:
+    def is_compatible(self, hardware: HardwareSpecs, quantized: bool = False) -> bool:
+        """
+        Check if model is compatible with hardware.
+        
+        Args:
+            hardware: HardwareSpecs object
+            quantized: The model will be loaded in int8/int4 on the CUDA GPU
+        """
+        # Check RAM requirement - 8-bit GPU loading (bitsandbytes) needs far less, but
+        # only when that is how the model will actually be loaded, and it must fit in VRAM
+        min_ram_gb = self.min_ram_gb
+        if quantized and hardware.has_cuda and self.quantized_ram_gb is not None:
+            min_ram_gb = self.quantized_ram_gb
+            if (hardware.gpu_memory_gb or 0.0) < min_ram_gb:
+                return False
+        if hardware.available_ram_gb < min_ram_gb:
             return False
         
         # Check GPU requirement
@@ -134,7 +208,8 @@ MODEL_CATALOG = [
         min_ram_gb=2.0,
         requires_gpu=False,
         recommended_for="cpu",
-        description="Lightweight model, perfect for CPU-only systems. Fast but basic interpretations."
+        description="Lightweight model, perfect for CPU-only systems. Fast but basic interpretations.",
+        quantized_ram_gb=1.0,
     ),
     ModelRecommendation(
         model_id="google/flan-t5-base",
@@ -143,7 +218,8 @@ MODEL_CATALOG = [
         min_ram_gb=4.0,
         requires_gpu=False,
         recommended_for="cpu",
-        description="Balanced model for CPU. Better quality than Small, still reasonably fast."
+        description="Balanced model for CPU. Better quality than Small, still reasonably fast.",
+        quantized_ram_gb=2.0,
     ),
     ModelRecommendation(
         model_id="google/flan-t5-large",
@@ -152,7 +228,8 @@ MODEL_CATALOG = [
         min_ram_gb=8.0,
         requires_gpu=False,
         recommended_for="cpu",
-        description="High-quality CPU model. Requires 8GB+ RAM. Slower but excellent results."
+        description="High-quality CPU model. Requires 8GB+ RAM. Slower but excellent results.",
+        quantized_ram_gb=3.0,
     ),
     ModelRecommendation(
         model_id="google/flan-t5-xl",
@@ -161,7 +238,8 @@ MODEL_CATALOG = [
         min_ram_gb=16.0,
         requires_gpu=True,
         recommended_for="gpu",
-        description="Very large model. Requires GPU with 16GB+ VRAM or 32GB+ system RAM."
+        description="Very large model. Requires GPU with 16GB+ VRAM or 32GB+ system RAM.",
+        quantized_ram_gb=6.0,
     ),
     ModelRecommendation(
         model_id="facebook/bart-large-cnn",
@@ -170,36 +248,44 @@ MODEL_CATALOG = [
         min_ram_gb=6.0,
         requires_gpu=False,
         recommended_for="cpu",
-        description="Good for summarization and analysis. Moderate resource usage."
+        description="Good for summarization and analysis. Moderate resource usage.",
+        quantized_ram_gb=2.5,
     ),
 ]
 
+# Recommended on CPUs with int8 dot-product (VNNI) instructions, when it fits
+VNNI_CPU_MODEL_ID = "google/flan-t5-large"
 
-def get_compatible_models(hardware: HardwareSpecs) -> list[ModelRecommendation]:
+# Sorted once; get_compatible_models only filters, preserving this order
+_CATALOG_BY_SIZE = sorted(MODEL_CATALOG, key=lambda m: m.size_mb)
+
+
+def get_compatible_models(hardware: HardwareSpecs, quantized: bool = False) -> list[ModelRecommendation]:
     """
     Get list of models compatible with current hardware.
     
     Args:
         hardware: HardwareSpecs object
+        quantized: Models will be loaded in int8/int4 on the CUDA GPU
         
     Returns:
         List of compatible ModelRecommendation objects, sorted by size
     """
-    compatible = [model for model in MODEL_CATALOG if model.is_compatible(hardware)]
-    return sorted(compatible, key=lambda m: m.size_mb)
+    return [model for model in _CATALOG_BY_SIZE if model.is_compatible(hardware, quantized)]
 
 
-def get_recommended_model(hardware: HardwareSpecs) -> ModelRecommendation:
+def get_recommended_model(hardware: HardwareSpecs, quantized: bool = False) -> ModelRecommendation:
     """
     Get the best recommended model for current hardware.
     
     Args:
         hardware: HardwareSpecs object
+        quantized: Models will be loaded in int8/int4 on the CUDA GPU
         
     Returns:
         ModelRecommendation object
     """
-    compatible = get_compatible_models(hardware)
+    compatible = get_compatible_models(hardware, quantized)
     
     if not compatible:
         # Fallback to smallest model if nothing is compatible
@@ -214,6 +300,12 @@ def get_recommended_model(hardware: HardwareSpecs) -> ModelRecommendation:
     
     # CPU only - recommend medium-sized CPU model if available
     cpu_models = [m for m in compatible if m.recommended_for == "cpu"]
+    if hardware.has_vnni:
+        # VNNI int8 kernels make FLAN-T5 Large fast enough; pick it by identity, since other
+        # catalog entries of similar size (BART) aren't instruction-tuned
+        for model in cpu_models:
+            if model.model_id == VNNI_CPU_MODEL_ID:
+                return model
     if len(cpu_models) >= 2:
         return cpu_models[1]  # Second option (Base instead of Small)
     elif cpu_models:
@@ -223,6 +315,9 @@ def get_recommended_model(hardware: HardwareSpecs) -> ModelRecommendation:
 
 
 if __name__ == "__main__":
+    from logging_config import configure
+    
+    configure()
     print("Detecting hardware...")
     hardware = detect_hardware()
     print("\n" + "="*60)
@@ -0,0 +1,98 @@
+"""
+Runs a local model in a dedicated process.
+Keeps inference threads and model memory out of the Streamlit server process, so
+script reruns and UI work don't compete with (or get slowed by) the model.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing as mp
+import sys
+import threading
+from typing import Any, Optional
+
+from local_model import MAX_NEW_TOKENS, PromptTemplate, load_cpu_model
+from logging_config import configure as configure_logging
+
+logger = logging.getLogger(__name__)
+
+
+def _serve(conn: Any, model_id: str, calibration_prompts: Optional[list[str]], engine: str) -> None:
+    """Worker process entry point: load the model once, then answer requests until the pipe closes."""
+    configure_logging()
+    try:
+        model = load_cpu_model(model_id, calibration_prompts, engine=engine)
+        model.warmup()
+    except Exception as e:
+        conn.send((False, f"{type(e).__name__}: {e}"))
+        return
+    conn.send((True, model.backend))
+
+    while True:
+        try:
+            method, args = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send((True, getattr(model, method)(*args)))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+
+
+class InferenceWorker:
+    """Drop-in stand-in for LocalModel that forwards generation to a worker process."""
+
+    def __init__(self, model_id: str, calibration_prompts: Optional[list[str]] = None, engine: str = "auto"):
+        # forkserver starts from a clean interpreter instead of copying Streamlit's heap
+        context = mp.get_context("forkserver" if sys.platform.startswith("linux") else "spawn")
+        self.model_id = model_id
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_serve,
+            args=(child_conn, model_id, calibration_prompts, engine),
+            name=f"inference-{model_id}",
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        self._lock = threading.Lock()
+        self.backend = f"{self._receive()} (worker process)"
+        logger.info(f"Inference worker for {model_id} running as pid {self._process.pid}")
+
+    def _receive(self) -> Any:
+        try:
+            ok, value = self._conn.recv()
+        except EOFError as e:
+            raise RuntimeError("Inference worker exited unexpectedly") from e
+        if not ok:
+            raise RuntimeError(f"Inference worker error: {value}")
+        return value
+
+    def _call(self, method: str, *args: Any) -> Any:
+        # One request in flight at a time; the worker's thread pool already uses every core
+        with self._lock:
+            self._conn.send((method, args))
+            return self._receive()
+
+    def generate(self, prompt: str, max_new_tokens: int = MAX_NEW_TOKENS) -> str:
+        return self._call("generate", prompt, max_new_tokens)
+
+    def generate_from_template(
+        self,
+        template: PromptTemplate,
+        text: str,
+        max_new_tokens: int = MAX_NEW_TOKENS,
+        cache_template: bool = True,
+    ) -> str:
+        return self._call("generate_from_template", template, text, max_new_tokens, cache_template)
+
+    def warmup(self) -> None:
+        """No-op: the worker warms the model up before reporting ready."""
+
+    def close(self) -> None:
+        """Stop the worker process and free its model memory."""
+        with self._lock:
+            self._conn.close()
+            self._process.join(timeout=5)
+            if self._process.is_alive():
+                self._process.terminate()
@@ -0,0 +1,627 @@
+"""
+Local inference backends for text2text models.
+Exports HuggingFace seq2seq models to ONNX Runtime (fused graphs + INT8 dynamic
+quantization) for fast CPU inference, with a plain PyTorch pipeline as the fallback.
+"""
+from __future__ import annotations
+
+import copy
+import importlib.util
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any, Optional
+
+from hardware import cpu_supports_fp16
+
+logger = logging.getLogger(__name__)
+
+# Exported/quantized model builds are reused across runs; LOCAL_MODEL_CACHE_DIR overrides the location
+ONNX_MODEL_DIR = Path("onnx_models")
+MAX_INPUT_TOKENS = 512
+MAX_NEW_TOKENS = 300
+TEXT_IDS_CACHE_SIZE = 16
+
+# Embeddings and the LM head stay in FP32 - quantizing them collapses output quality
+QUANTIZATION_EXCLUDED_NODES = ["*shared*", "*embed_tokens*", "*lm_head*"]
+
+# Public-domain lyrics used to calibrate activation ranges for static INT8 quantization
+CALIBRATION_LYRICS = [
+    "Amazing grace, how sweet the sound\nThat saved a wretch like me\nI once was lost, but now am found\nWas blind, but now I see",
+    "Should auld acquaintance be forgot\nAnd never brought to mind?\nShould auld acquaintance be forgot\nAnd days of auld lang syne?",
+    "Oh, give me a home where the buffalo roam\nWhere the deer and the antelope play\nWhere seldom is heard a discouraging word\nAnd the skies are not cloudy all day",
+    "Oh, Susanna, don't you cry for me\nFor I come from Alabama\nWith my banjo on my knee",
+    "Swing low, sweet chariot\nComing for to carry me home\nI looked over Jordan, and what did I see\nA band of angels coming after me",
+    "Oh Shenandoah, I long to hear you\nAway, you rolling river\nOh Shenandoah, I long to hear you\nAway, I'm bound away, across the wide Missouri",
+    "Oh Danny boy, the pipes, the pipes are calling\nFrom glen to glen, and down the mountain side\nThe summer's gone, and all the roses falling\nIt's you, it's you must go and I must bide",
+    "Are you going to Scarborough Fair?\nParsley, sage, rosemary and thyme\nRemember me to one who lives there\nShe once was a true love of mine",
+    "When Johnny comes marching home again, hurrah, hurrah\nWe'll give him a hearty welcome then, hurrah, hurrah\nThe men will cheer and the boys will shout\nThe ladies they will all turn out",
+    "Take me out to the ball game\nTake me out with the crowd\nBuy me some peanuts and Cracker Jack\nI don't care if I never get back",
+    "Mine eyes have seen the glory of the coming of the Lord\nHe is trampling out the vintage where the grapes of wrath are stored",
+    "Row, row, row your boat\nGently down the stream\nMerrily, merrily, merrily, merrily\nLife is but a dream",
+]
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A prompt with fixed text around a single variable slot."""
+    prefix: str
+    suffix: str
+
+    def render(self, text: str) -> str:
+        return f"{self.prefix}{text}{self.suffix}"
+
+
+@dataclass(frozen=True)
+class LoadOptions:
+    """How to load a local model; hashable so it can key the shared model registry."""
+    use_gpu: bool = False
+    static_int8: bool = False  # Calibrate a static INT8 encoder on sample lyrics (CPU/ONNX only)
+    isolated: bool = False  # Run the model in a separate worker process (CPU only)
+    precision: str = "fp16"  # GPU weight precision - "fp16", "int8" or "int4" (CUDA only for int8/int4)
+    offload: bool = False  # Stream layers that don't fit in VRAM from RAM/disk (CUDA fp16 only)
+    cpu_engine: str = "auto"  # "auto" (OpenVINO/ONNX Runtime/PyTorch) or "ctranslate2"
+
+
+@dataclass
+class LocalModel:
+    """A loaded seq2seq model together with its tokenizer."""
+    model_id: str
+    backend: str  # "onnx-int8*", "openvino-int8", "ctranslate2-int8", "pytorch-*", "bitsandbytes-*" or "llama.cpp"
+    tokenizer: Any
+    model: Any
+    _template_ids: dict = field(default_factory=dict, repr=False)
+    _generation_config: Any = field(default=None, repr=False)
+    _text_ids: OrderedDict = field(default_factory=OrderedDict, repr=False)
+    _text_ids_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def generate(self, prompt: str, max_new_tokens: int = MAX_NEW_TOKENS) -> str:
+        """Greedy-decode a response for the given prompt."""
+        if self.backend == "llama.cpp":
+            result = self.model(prompt, max_tokens=max_new_tokens, temperature=0.0)
+            return result["choices"][0]["text"].strip()
+        if self.backend == "ctranslate2-int8":
+            input_ids = self.tokenizer(prompt, truncation=True, max_length=MAX_INPUT_TOKENS)["input_ids"]
+            return self._translate_ids(input_ids, max_new_tokens)
+
+        inputs = self.tokenizer(
+            prompt,
+            return_tensors="pt",
+            truncation=True,
+            max_length=MAX_INPUT_TOKENS,
+        ).to(self.model.device)
+        return self._generate_ids(inputs, max_new_tokens)
+
+    def generate_from_template(
+        self,
+        template: PromptTemplate,
+        text: str,
+        max_new_tokens: int = MAX_NEW_TOKENS,
+        cache_template: bool = True,
+    ) -> str:
+        """
+        Greedy-decode a response for a templated prompt. Only the variable text is
+        truncated (by tokens), so the instructions and trailing cue are never cut off.
+        The template's fixed parts are tokenized once per model unless cache_template
+        is False, for one-off templates such as ones embedding a user question.
+        """
+        if self.backend == "llama.cpp":
+            return self.generate(template.render(text), max_new_tokens)
+
+        template_ids = self._template_ids.get(template)
+        if template_ids is None:
+            template_ids = (
+                self.tokenizer(template.prefix, add_special_tokens=False)["input_ids"],
+                self.tokenizer(template.suffix, add_special_tokens=False)["input_ids"],
+            )
+            if cache_template:
+                self._template_ids[template] = template_ids
+        prefix_ids, suffix_ids = template_ids
+        budget = MAX_INPUT_TOKENS - len(prefix_ids) - len(suffix_ids) - self.tokenizer.num_special_tokens_to_add()
+        text_ids = self._encode_text(text)[:max(budget, 0)]
+        input_ids = self.tokenizer.build_inputs_with_special_tokens(prefix_ids + text_ids + suffix_ids)
+        if self.backend == "ctranslate2-int8":
+            return self._translate_ids(input_ids, max_new_tokens)
+        import torch
+
+        input_ids = torch.tensor([input_ids], device=self.model.device)
+        inputs = {"input_ids": input_ids, "attention_mask": torch.ones_like(input_ids)}
+        return self._generate_ids(inputs, max_new_tokens)
+
+    def _encode_text(self, text: str) -> list[int]:
+        """Token ids for variable prompt text; the same lyrics recur across interpret and Q&A turns."""
+        with self._text_ids_lock:
+            ids = self._text_ids.get(text)
+            if ids is not None:
+                self._text_ids.move_to_end(text)
+                return ids
+        ids = self.tokenizer(text, add_special_tokens=False)["input_ids"]
+        with self._text_ids_lock:
+            self._text_ids[text] = ids
+            if len(self._text_ids) > TEXT_IDS_CACHE_SIZE:
+                self._text_ids.popitem(last=False)
+        return ids
+
+    def _generate_ids(self, inputs: Any, max_new_tokens: int) -> str:
+        import torch
+
+        if self._generation_config is None:
+            # Greedy decoding with the KV cache, built once instead of merged from kwargs per call
+            config = copy.deepcopy(self.model.generation_config)
+            config.update(do_sample=False, num_beams=1, use_cache=True, max_new_tokens=MAX_NEW_TOKENS)
+            self._generation_config = config
+        # Stricter than generate()'s own no_grad: skips autograd view and version tracking
+        with torch.inference_mode():
+            output_ids = self.model.generate(
+                **inputs,
+                generation_config=self._generation_config,
+                max_new_tokens=max_new_tokens,
+            )
+        return self.tokenizer.decode(output_ids[0], skip_special_tokens=True)
+
+    def _translate_ids(self, input_ids: list[int], max_new_tokens: int) -> str:
+        """Greedy-decode with CTranslate2, which takes and returns token strings rather than ids."""
+        tokens = self.tokenizer.convert_ids_to_tokens(input_ids)
+        result = self.model.translate_batch([tokens], beam_size=1, max_decoding_length=max_new_tokens)
+        output_ids = self.tokenizer.convert_tokens_to_ids(result[0].hypotheses[0])
+        return self.tokenizer.decode(output_ids, skip_special_tokens=True)
+
+    def warmup(self) -> None:
+        """Run a tiny generation so allocator arenas and kernels are primed before real requests."""
+        self.generate("warmup", max_new_tokens=2)
+
+
+def onnx_runtime_available() -> bool:
+    """Check whether optimum's ONNX Runtime integration is installed."""
+    return all(importlib.util.find_spec(name) is not None for name in ("optimum", "onnxruntime"))
+
+
+def openvino_available() -> bool:
+    """Check whether optimum-intel's OpenVINO integration is installed and can see a CPU."""
+    if importlib.util.find_spec("openvino") is None or importlib.util.find_spec("optimum.intel") is None:
+        return False
+    import openvino
+
+    return "CPU" in openvino.Core().available_devices
+
+
+def _model_dir(model_id: str) -> Path:
+    """Directory holding the exported ONNX artifacts for a model."""
+    # Read at call time so values from .env (loaded after import) apply
+    base_dir = Path(os.getenv("LOCAL_MODEL_CACHE_DIR") or ONNX_MODEL_DIR).expanduser()
+    return base_dir / model_id.replace("/", "--")
+
+
+def _excluded_nodes(onnx_path: Path) -> list[str]:
+    """Resolve QUANTIZATION_EXCLUDED_NODES patterns to node names in an ONNX graph."""
+    import onnx
+
+    graph = onnx.load(str(onnx_path), load_external_data=False).graph
+    return [
+        node.name for node in graph.node
+        if any(fnmatch(node.name, pattern) for pattern in QUANTIZATION_EXCLUDED_NODES)
+    ]
+
+
+def _copy_configs(src: Path, dst: Path) -> None:
+    """Copy model configs between artifact dirs; config.json doubles as the 'stage done' marker."""
+    for name in ("generation_config.json", "config.json"):
+        if (src / name).exists():
+            shutil.copy(src / name, dst / name)
+
+
+def _onnx_file(model_dir: Path, stem: str) -> str:
+    """Find the ONNX file for a graph (encoder_model, decoder_model, ...) whatever its suffix."""
+    return next(path.name for path in sorted(model_dir.glob(f"{stem}*.onnx")))
+
+
+def _convert_to_fp16(src: Path, dst: Path) -> None:
+    """Convert an ONNX graph to FP16, keeping FP32 inputs/outputs so callers are unaffected."""
+    import onnx
+    from onnxruntime.transformers.float16 import convert_float_to_float16
+
+    model = convert_float_to_float16(onnx.load(str(src)), keep_io_types=True)
+    onnx.save(model, str(dst), save_as_external_data=True, location=f"{dst.name}_data")
+
+
+def _quantize_static(src: Path, dst: Path, tokenizer: Any, prompts: list[str]) -> None:
+    """Static INT8 quantization (u8 activations, s8 weights) calibrated on the given prompts."""
+    import onnx
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    input_names = {graph_input.name for graph_input in onnx.load(str(src), load_external_data=False).graph.input}
+
+    class PromptReader(CalibrationDataReader):
+        """Feeds the tokenized calibration prompts to the quantizer one at a time."""
+
+        def __init__(self):
+            self._batches = iter(prompts)
+
+        def get_next(self) -> Optional[dict]:
+            prompt = next(self._batches, None)
+            if prompt is None:
+                return None
+            encoded = tokenizer(prompt, return_tensors="np", truncation=True, max_length=MAX_INPUT_TOKENS)
+            return {name: array for name, array in encoded.items() if name in input_names}
+
+    quantize_static(
+        model_input=str(src),
+        model_output=str(dst),
+        calibration_data_reader=PromptReader(),
+        quant_format=QuantFormat.QOperator,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        nodes_to_exclude=_excluded_nodes(src),
+    )
+
+
+def export_onnx_int8(
+    model_id: str,
+    tokenizer: Any = None,
+    calibration_prompts: Optional[list[str]] = None,
+) -> Path:
+    """
+    Export a seq2seq model to ONNX, apply graph fusions, then INT8 dynamic quantization.
+    With calibration prompts the encoder is statically quantized instead, so its
+    activations are INT8 end-to-end; otherwise, on CPUs with native FP16, the encoder
+    is converted to FP16. Each stage is written to disk once and reused on later runs.
+
+    Args:
+        model_id: HuggingFace model ID
+        tokenizer: Tokenizer used to encode the calibration prompts
+        calibration_prompts: Representative prompts enabling static encoder quantization
+
+    Returns:
+        Directory containing the quantized ONNX files
+    """
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTOptimizer, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig, OptimizationConfig
+
+    export_dir = _model_dir(model_id) / "fp32"
+    optimized_dir = _model_dir(model_id) / "optimized"
+    quant_dir = _model_dir(model_id) / ("int8-static" if calibration_prompts else "int8")
+    if (quant_dir / "config.json").exists():
+        return quant_dir
+
+    if not (export_dir / "config.json").exists():
+        logger.info(f"Exporting {model_id} to ONNX (one-time)")
+        # Separate decoder/decoder_with_past graphs keep the KV cache; the merged decoder's
+        # If-node subgraphs don't quantize cleanly
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_id, export=True, use_cache=True, use_merged=False)
+        model.save_pretrained(export_dir)
+
+    if not (optimized_dir / "config.json").exists():
+        # Fuse LayerNorm/GELU/attention before quantizing so the fused ops get INT8 kernels
+        logger.info(f"Optimizing ONNX graphs for {model_id} (one-time)")
+        optimizer = ORTOptimizer.from_pretrained(
+            export_dir, file_names=[path.name for path in sorted(export_dir.glob("*.onnx"))]
+        )
+        optimizer.optimize(save_dir=optimized_dir, optimization_config=OptimizationConfig(optimization_level=2))
+        _copy_configs(export_dir, optimized_dir)
+
+    quant_dir.mkdir(parents=True, exist_ok=True)
+    onnx_paths = sorted(optimized_dir.glob("*.onnx"))
+    encoder_path = next(path for path in onnx_paths if path.name.startswith("encoder_model"))
+    if calibration_prompts:
+        logger.info(f"Calibrating static INT8 encoder for {model_id} (one-time)")
+        _quantize_static(encoder_path, quant_dir / f"{encoder_path.stem}_static.onnx", tokenizer, calibration_prompts)
+        onnx_paths.remove(encoder_path)
+    elif cpu_supports_fp16():
+        # The encoder pass over the lyrics is bandwidth-bound; FP16 halves the bytes moved
+        logger.info(f"Converting {model_id} encoder to FP16 (one-time)")
+        _convert_to_fp16(encoder_path, quant_dir / f"{encoder_path.stem}_fp16.onnx")
+        onnx_paths.remove(encoder_path)
+
+    logger.info(f"Quantizing {model_id} to INT8 (one-time)")
+    for onnx_path in onnx_paths:
+        qconfig = AutoQuantizationConfig.avx512_vnni(
+            is_static=False,
+            per_channel=False,
+            nodes_to_exclude=_excluded_nodes(onnx_path),
+        )
+        quantizer = ORTQuantizer.from_pretrained(optimized_dir, file_name=onnx_path.name)
+        quantizer.quantize(save_dir=quant_dir, quantization_config=qconfig)
+
+    # Copy config last so a half-finished quantization is redone next time
+    _copy_configs(optimized_dir, quant_dir)
+    return quant_dir
+
+
+def physical_cores() -> int:
+    """Physical core count; SMT siblings share the FPUs, so extra threads only add contention."""
+    try:
+        import psutil
+        cores = psutil.cpu_count(logical=False)
+    except ImportError:
+        cores = None
+    return cores or os.cpu_count() or 4
+
+
+def session_options():
+    """
+    ONNX Runtime session options: all graph optimizations, one intra-op thread per
+    physical core and no inter-op pool. Worker threads sleep instead of spinning
+    between ops, so several sessions (encoder, decoders, concurrent users) don't
+    burn each other's cores.
+    """
+    import onnxruntime as ort
+
+    ort.set_default_logger_severity(3)
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = physical_cores()
+    options.inter_op_num_threads = 1
+    options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+    return options
+
+
+def load_tokenizer(model_id: str) -> Any:
+    """Load the tokenizer for a model."""
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(model_id)
+
+
+def load_onnx_model(model_id: str, tokenizer: Any, calibration_prompts: Optional[list[str]] = None) -> LocalModel:
+    """
+    Load the INT8 ONNX Runtime build of a model, exporting it on first use.
+    Passing calibration prompts selects the statically quantized encoder.
+    """
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    quant_dir = export_onnx_int8(model_id, tokenizer, calibration_prompts)
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        quant_dir,
+        encoder_file_name=_onnx_file(quant_dir, "encoder_model"),
+        decoder_file_name=_onnx_file(quant_dir, "decoder_model"),
+        decoder_with_past_file_name=_onnx_file(quant_dir, "decoder_with_past_model"),
+        use_cache=True,
+        session_options=session_options(),
+        provider="CPUExecutionProvider",
+    )
+    backend = "onnx-int8-static" if calibration_prompts else "onnx-int8"
+    return LocalModel(model_id=model_id, backend=backend, tokenizer=tokenizer, model=model)
+
+
+def load_openvino_model(model_id: str, tokenizer: Any) -> LocalModel:
+    """
+    Load an OpenVINO build of a model with INT8 weights (optional dependency:
+    optimum[openvino]), exporting and compressing it on first use.
+    """
+    from optimum.intel import OVModelForSeq2SeqLM, OVWeightQuantizationConfig
+
+    ov_dir = _model_dir(model_id) / "openvino-int8"
+    ov_config = {
+        "PERFORMANCE_HINT": "LATENCY",
+        "NUM_STREAMS": "1",
+        "INFERENCE_NUM_THREADS": str(physical_cores()),
+        "CACHE_DIR": str(ov_dir / "compiled"),
+    }
+    if not (ov_dir / "config.json").exists():
+        logger.info(f"Exporting {model_id} to OpenVINO INT8 (one-time)")
+        model = OVModelForSeq2SeqLM.from_pretrained(
+            model_id,
+            export=True,
+            compile=False,
+            quantization_config=OVWeightQuantizationConfig(bits=8),
+        )
+        model.save_pretrained(ov_dir)
+    model = OVModelForSeq2SeqLM.from_pretrained(ov_dir, device="CPU", ov_config=ov_config)
+    return LocalModel(model_id=model_id, backend="openvino-int8", tokenizer=tokenizer, model=model)
+
+
+def load_cpu_model(
+    model_id: str,
+    calibration_prompts: Optional[list[str]] = None,
+    tokenizer: Any = None,
+    engine: str = "auto",
+) -> LocalModel:
+    """
+    Load a model for CPU inference: .gguf files run on llama.cpp, anything else on
+    OpenVINO or ONNX Runtime INT8 builds when installed, falling back to PyTorch.
+    Static INT8 calibration is ONNX Runtime only, so it skips OpenVINO.
+
+    Args:
+        model_id: HuggingFace model ID or .gguf path
+        calibration_prompts: Prompts for static encoder quantization (ONNX only)
+        tokenizer: Already-loaded tokenizer to reuse, if any
+        engine: "auto", or "ctranslate2" to use CTranslate2 INT8 when installed
+    """
+    if model_id.endswith(".gguf"):
+        return load_gguf_model(model_id)
+
+    tokenizer = tokenizer or load_tokenizer(model_id)
+    if engine == "ctranslate2":
+        try:
+            return load_ct2_model(model_id, tokenizer)
+        except Exception as e:
+            logger.warning(f"CTranslate2 load failed for {model_id}, using the default CPU backend: {e}")
+    if not calibration_prompts and openvino_available():
+        try:
+            return load_openvino_model(model_id, tokenizer)
+        except Exception as e:
+            logger.warning(f"OpenVINO load failed for {model_id}, trying ONNX Runtime: {e}")
+    if onnx_runtime_available():
+        try:
+            return load_onnx_model(model_id, tokenizer, calibration_prompts)
+        except Exception as e:
+            logger.warning(f"ONNX Runtime load failed for {model_id}, using PyTorch: {e}")
+    return load_pytorch_model(model_id, tokenizer)
+
+
+def load_ct2_model(model_id: str, tokenizer: Any) -> LocalModel:
+    """
+    Load a model on CTranslate2 (optional dependency: ctranslate2), converting it to an
+    INT8 build on first use. Its fused INT8 kernels and greedy decoder typically run
+    seq2seq models several times faster than PyTorch on CPU.
+
+    Args:
+        model_id: HuggingFace model ID
+        tokenizer: Tokenizer for the model
+    """
+    try:
+        import ctranslate2
+    except ImportError as e:
+        raise ImportError("The CTranslate2 backend requires ctranslate2: pip install ctranslate2") from e
+
+    ct2_dir = _model_dir(model_id) / "ct2-int8"
+    if not (ct2_dir / "model.bin").exists():
+        logger.info(f"Converting {model_id} to CTranslate2 INT8 (first run only)")
+        converter = ctranslate2.converters.TransformersConverter(model_id)
+        converter.convert(str(ct2_dir), quantization="int8", force=True)
+
+    translator = ctranslate2.Translator(
+        str(ct2_dir),
+        device="cpu",
+        compute_type="int8",
+        intra_threads=physical_cores(),
+        inter_threads=1,
+    )
+    return LocalModel(model_id=model_id, backend="ctranslate2-int8", tokenizer=tokenizer, model=translator)
+
+
+def load_gguf_model(model_path: str, use_gpu: bool = False) -> LocalModel:
+    """
+    Load a GGUF checkpoint with llama.cpp (optional dependency: llama-cpp-python).
+
+    Args:
+        model_path: Local .gguf file, or "org/repo/file.gguf" to download from HuggingFace
+        use_gpu: Offload all layers to the GPU when llama.cpp was built with GPU support
+    """
+    try:
+        from llama_cpp import Llama
+    except ImportError as e:
+        raise ImportError("GGUF models require llama-cpp-python: pip install llama-cpp-python") from e
+
+    options = {
+        "n_ctx": 2048,
+        "n_threads": os.cpu_count(),
+        "n_gpu_layers": -1 if use_gpu else 0,
+        "verbose": False,
+    }
+    if Path(model_path).is_file():
+        llm = Llama(model_path=model_path, **options)
+    else:
+        repo_id, _, filename = model_path.rpartition("/")
+        llm = Llama.from_pretrained(repo_id=repo_id, filename=filename, **options)
+    return LocalModel(model_id=model_path, backend="llama.cpp", tokenizer=None, model=llm)
+
+
+def load_pytorch_model(
+    model_id: str, tokenizer: Any, device: Any = -1, precision: str = "fp16", offload: bool = False
+) -> LocalModel:
+    """
+    Load a model through transformers on the given device. Weights are streamed straight
+    onto the target device (low_cpu_mem_usage), so peak RAM stays near one model copy.
+    On CPU the Linear layers are dynamically quantized to INT8, halving the weight
+    bytes each decode step has to stream from memory.
+
+    Args:
+        model_id: HuggingFace model ID
+        tokenizer: Tokenizer for the model
+        device: -1 for CPU, 0 for CUDA, or "mps"
+        precision: GPU weight precision - "fp16" (16-bit; bf16 on Ampere+), or "int8"/"int4" via bitsandbytes (CUDA only)
+        offload: Let fp16 models larger than VRAM spill layers to RAM/disk (CUDA only)
+    """
+    import torch
+    from transformers import AutoModelForSeq2SeqLM
+
+    if device == -1:
+        fp32_model = AutoModelForSeq2SeqLM.from_pretrained(model_id, low_cpu_mem_usage=True)
+        # Same rule as the ONNX path: the LM head stays FP32
+        linear_layers = {
+            name for name, module in fp32_model.named_modules()
+            if isinstance(module, torch.nn.Linear) and not any(
+                fnmatch(name, pattern) for pattern in QUANTIZATION_EXCLUDED_NODES
+            )
+        }
+        model = torch.ao.quantization.quantize_dynamic(fp32_model, linear_layers, dtype=torch.qint8, inplace=True)
+        return LocalModel(model_id=model_id, backend="pytorch-int8", tokenizer=tokenizer, model=model.eval())
+
+    if precision in ("int8", "int4"):
+        if device != 0:
+            raise ValueError(f"{precision} loading needs a CUDA GPU (bitsandbytes)")
+        from transformers import BitsAndBytesConfig
+
+        if precision == "int8":
+            quantization_config = BitsAndBytesConfig(load_in_8bit=True)
+        else:
+            quantization_config = BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_quant_type="nf4",
+                bnb_4bit_compute_dtype=torch.bfloat16,
+            )
+        model = AutoModelForSeq2SeqLM.from_pretrained(
+            model_id, quantization_config=quantization_config, device_map="auto"
+        )
+        return LocalModel(model_id=model_id, backend=f"bitsandbytes-{precision}", tokenizer=tokenizer, model=model)
+
+    if offload and device == 0:
+        return _load_offloaded_model(model_id, tokenizer)
+
+    dtype, dtype_name = _half_dtype(device)
+    fp16_model = AutoModelForSeq2SeqLM.from_pretrained(
+        model_id,
+        torch_dtype=dtype,
+        low_cpu_mem_usage=True,
+        device_map={"": "cuda:0" if device == 0 else device},
+    ).eval()
+    model = LocalModel(model_id=model_id, backend=f"pytorch-{dtype_name}", tokenizer=tokenizer, model=fp16_model)
+    if device == 0:
+        # Fuse elementwise ops and cut per-op Python dispatch; dynamic shapes avoid a
+        # recompile for every new prompt length. Compiling is lazy, so warm up here to
+        # surface failures while the eager forward can still be restored.
+        eager_forward = fp16_model.forward
+        try:
+            fp16_model.forward = torch.compile(eager_forward, dynamic=True)
+            model.warmup()
+            model.backend = f"pytorch-{dtype_name}-compiled"
+        except Exception as e:
+            logger.warning(f"torch.compile failed for {model_id}, running eager: {e}")
+            fp16_model.forward = eager_forward
+    return model
+
+
+def _half_dtype(device: Any) -> tuple[Any, str]:
+    """
+    16-bit weight dtype for a GPU: bf16 on Ampere or newer CUDA cards, fp16 otherwise.
+    bf16 keeps fp32's exponent range, which T5 models (trained in bf16) need - their
+    activations can overflow fp16 into inf/NaN.
+    """
+    import torch
+
+    if device == 0 and torch.cuda.get_device_capability(0)[0] >= 8:
+        return torch.bfloat16, "bf16"
+    return torch.float16, "fp16"
+
+
+def _load_offloaded_model(model_id: str, tokenizer: Any) -> LocalModel:
+    """
+    Load a 16-bit model with accelerate's device map: as many layers as fit in 80% of free
+    VRAM stay on the GPU, the rest live in RAM (then disk) and are streamed to the GPU
+    by forward hooks layer by layer.
+    """
+    import psutil
+    import torch
+    from transformers import AutoModelForSeq2SeqLM
+
+    dtype, dtype_name = _half_dtype(0)
+    free_vram, _ = torch.cuda.mem_get_info(0)
+    max_memory = {
+        0: int(free_vram * 0.8),
+        "cpu": int(psutil.virtual_memory().available * 0.8),
+    }
+    model = AutoModelForSeq2SeqLM.from_pretrained(
+        model_id,
+        torch_dtype=dtype,
+        device_map="auto",
+        max_memory=max_memory,
+        offload_folder=str(_model_dir(model_id) / "offload"),
+    )
+    return LocalModel(model_id=model_id, backend=f"pytorch-{dtype_name}-offload", tokenizer=tokenizer, model=model)
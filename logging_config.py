@@ -0,0 +1,43 @@
+"""
+Process-wide logging setup.
+Log records are handed to a queue on the calling thread and formatted/written by a
+background listener, so Streamlit script threads never block on stderr I/O.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = "%(asctime)s | %(levelname)s | %(message)s"
+
+_listener: QueueListener | None = None
+_lock = threading.Lock()
+
+
+def configure(level: int = logging.INFO) -> None:
+    """Route root logging through a queue to a stderr handler. Safe to call on every rerun."""
+    global _listener
+    with _lock:
+        if _listener is None:
+            _listener = _start_listener(level)
+
+
+def _start_listener(level: int) -> QueueListener:
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    root = logging.getLogger()
+    # Replace handlers any earlier basicConfig() call attached, so each record is written once
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -10,12 +10,16 @@ ydl_opts = {
     'writeautomaticsub': True,
     'subtitleslangs': ['en'],
     'quiet': False,
+    'noplaylist': True,
+    # Only subtitle track URLs are needed: skip HLS/DASH manifests and translated subtitle lists
+    'extractor_args': {'youtube': {'skip': ['hls', 'dash', 'translated_subs']}},
 }
 
 print(f"Getting info for: {url}")
 
 with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-    info = ydl.extract_info(url, download=False)
+    # process=False skips format sorting/selection; subtitles and automatic_captions are still filled in
+    info = ydl.extract_info(url, download=False, process=False)
     
     print(f"\nTitle: {info.get('title')}")
     print(f"Uploader: {info.get('uploader')}")
@@ -1,42 +1,50 @@
 """Debug YouTube Music page structure"""
-from playwright.sync_api import sync_playwright
-import time
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+import sys
 
 url = 'https://music.youtube.com/watch?v=kHvXvoXJu48'
+# Pass --interactive to keep the browser open for manual inspection
+interactive = '--interactive' in sys.argv
 
 with sync_playwright() as p:
     browser = p.chromium.launch(headless=False)
     page = browser.new_page()
     
     print(f"Loading: {url}")
-    page.goto(url, wait_until='networkidle', timeout=45000)
-    
-    print("Waiting 8 seconds for page to fully load...")
-    time.sleep(8)
+    # YouTube Music keeps XHRs open, so 'networkidle' rarely fires; wait for the description instead
+    page.goto(url, wait_until='domcontentloaded', timeout=20000)
+    try:
+        page.wait_for_selector(
+            'ytmusic-description-shelf-renderer, yt-formatted-string.description',
+            state='attached',
+            timeout=15000,
+        )
+    except PlaywrightTimeoutError:
+        print("Description not found within 15 seconds, inspecting the page as loaded")
     
     # Save screenshot
     page.screenshot(path='ytmusic_debug.png')
     print("Saved screenshot: ytmusic_debug.png")
     
-    # Get all yt-formatted-string elements
-    elements = page.locator('yt-formatted-string').all()
-    print(f"\nFound {len(elements)} yt-formatted-string elements")
+    # Get all yt-formatted-string elements in one browser round-trip
+    data = page.locator('yt-formatted-string').evaluate_all(
+        "els => ({count: els.length, items: els.slice(0, 10).map(e => ({text: e.innerText, cls: e.className}))})"
+    )
+    print(f"\nFound {data['count']} yt-formatted-string elements")
+    
+    for i, item in enumerate(data['items']):
+        text = item['text']
+        if text and len(text) > 20:
+            print(f"\nElement {i}:")
+            print(f"  Classes: {item['cls']}")
+            print(f"  Text ({len(text)} chars): {text[:100]}...")
     
-    for i, elem in enumerate(elements[:10]):
+    if interactive:
+        # Wait until the window is closed (up to 5 minutes) instead of a fixed sleep
+        print("\n\nClose the browser window or press Ctrl+C to finish...")
         try:
-            text = elem.inner_text()
-            classes = elem.get_attribute('class')
-            if text and len(text) > 20:
-                print(f"\nElement {i}:")
-                print(f"  Classes: {classes}")
-                print(f"  Text ({len(text)} chars): {text[:100]}...")
-        except:
+            page.wait_for_event('close', timeout=300000)
+        except (KeyboardInterrupt, PlaywrightTimeoutError):
             pass
     
-    print("\n\nPress Ctrl+C to close...")
-    try:
-        time.sleep(300)
-    except KeyboardInterrupt:
-        pass
-    
     browser.close()
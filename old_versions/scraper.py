@@ -6,6 +6,8 @@ from __future__ import annotations
 
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Optional
 from urllib.parse import parse_qs, urlparse
 
@@ -26,7 +28,14 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Newlines/tabs inside caption segments become spaces in one C-level pass
+_WS_TABLE = str.maketrans({'\n': ' ', '\t': ' '})
+# Compiled once: v= query parameter, youtu.be/, embed/, shorts/ and live/ URLs; IDs are 11 characters
+_VIDEO_ID_RE = re.compile(r'(?:[?&]v=|youtu\.be/|/embed/|/shorts/|/live/)([A-Za-z0-9_-]{11})')
+_VIDEO_ID_ONLY_RE = re.compile(r'[A-Za-z0-9_-]{11}')
 
+
+@lru_cache(maxsize=1024)
 def extract_video_id(url: str) -> Optional[str]:
     """
     Extract YouTube video ID from various URL formats.
@@ -37,23 +46,19 @@ def extract_video_id(url: str) -> Optional[str]:
     - youtube.com/embed/VIDEO_ID
     - music.youtube.com/watch?v=VIDEO_ID
     """
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([^&\n?#]+)',
-        r'music\.youtube\.com\/watch\?v=([^&\n?#]+)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
+    match = _VIDEO_ID_RE.search(url)
+    if match:
+        return match.group(1)
     
-    # Try parsing query parameters
+    # Slow path for other URL shapes: a v= parameter, else the last path segment
     try:
-        parsed = urlparse(url)
+        parsed = urlparse(url if '//' in url else f'https://{url}')
         if 'youtube.com' in parsed.netloc or 'youtu.be' in parsed.netloc:
-            query_params = parse_qs(parsed.query)
-            if 'v' in query_params:
-                return query_params['v'][0]
+            video_id = parse_qs(parsed.query).get('v', [None])[0]
+            if not video_id:
+                segment = parsed.path.rstrip('/').rsplit('/', 1)[-1]
+                video_id = segment if _VIDEO_ID_ONLY_RE.fullmatch(segment) else None
+            return video_id
     except Exception as e:
         logger.error(f"Error parsing URL: {e}")
     
@@ -86,10 +91,7 @@ def get_youtube_captions(video_id: str) -> Optional[str]:
         transcript_data = YouTubeTranscriptApi.get_transcript(video_id, languages=['en', 'en-US'])
         
         # Concatenate all transcript segments
-        full_text = ' '.join([entry['text'] for entry in transcript_data])
-        
-        # Clean up the text
-        full_text = full_text.replace('\n', ' ').strip()
+        full_text = ' '.join(entry['text'] for entry in transcript_data).translate(_WS_TABLE).strip()
         
         logger.info(f"Successfully retrieved captions for video ID: {video_id}")
         return full_text
@@ -98,8 +100,7 @@ def get_youtube_captions(video_id: str) -> Optional[str]:
         # Try to get any available transcript if English fails
         try:
             transcript_data = YouTubeTranscriptApi.get_transcript(video_id)
-            full_text = ' '.join([entry['text'] for entry in transcript_data])
-            full_text = full_text.replace('\n', ' ').strip()
+            full_text = ' '.join(entry['text'] for entry in transcript_data).translate(_WS_TABLE).strip()
             logger.info(f"Retrieved non-English captions for video ID: {video_id}")
             return full_text
         except Exception as e2:
@@ -107,6 +108,25 @@ def get_youtube_captions(video_id: str) -> Optional[str]:
             return None
 
 
+def get_youtube_captions_batch(video_ids: list[str], max_workers: int = 8) -> dict[str, Optional[str]]:
+    """
+    Retrieve captions for several videos concurrently; each fetch is a network round-trip.
+    
+    Args:
+        video_ids: YouTube video IDs
+        max_workers: Concurrent fetches
+        
+    Returns:
+        Dict of video_id -> transcript text (or None), in input order
+    """
+    video_ids = list(dict.fromkeys(video_ids))
+    if not video_ids:
+        return {}
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(video_ids)), thread_name_prefix="captions") as pool:
+        return dict(zip(video_ids, pool.map(get_youtube_captions, video_ids)))
+
+
 def search_youtube_for_song(song_name: str, artist: str = "") -> Optional[str]:
     """
     Search YouTube for a song and return the first result's video ID.
@@ -186,10 +206,10 @@ def get_lyrics_from_input(user_input: str) -> tuple[Optional[str], str]:
     # Assume it's a song name/artist search
     else:
         # Try to parse "Artist - Song Name" format
-        if ' - ' in user_input:
-            parts = user_input.split(' - ', 1)
-            artist = parts[0].strip()
-            song_name = parts[1].strip()
+        artist, separator, song_name = user_input.partition(' - ')
+        if separator:
+            artist = artist.strip()
+            song_name = song_name.strip()
         else:
             artist = ""
             song_name = user_input
@@ -1,5 +1,5 @@
 """Test updated scraper with multiple sources"""
-from scraper_v2 import get_lyrics_from_input
+from scraper_v2 import get_lyrics_batch
 
 tests = [
     ("YouTube Music", "https://music.youtube.com/watch?v=kHvXvoXJu48"),
@@ -11,12 +11,15 @@ print("=" * 70)
 print("TESTING UPDATED SCRAPER WITH OPEN-SOURCE METHODS")
 print("=" * 70)
 
+# The lookups are independent and network-bound: run them concurrently, report in order
+results = get_lyrics_batch([query for _, query in tests])
+
 for name, query in tests:
     print(f"\n[{name}]")
     print(f"Query: {query}")
     print("-" * 70)
     
-    lyrics, status = get_lyrics_from_input(query)
+    lyrics, status = results[query]
     
     print(status)
     if lyrics:
@@ -1,7 +1,7 @@
 """Test downloading and parsing subtitle"""
 import requests
 import yt_dlp
-from bs4 import BeautifulSoup
+from lxml import etree
 
 video_id = "dQw4w9WgXcQ"
 url = f"https://www.youtube.com/watch?v={video_id}"
@@ -36,15 +36,18 @@ with yt_dlp.YoutubeDL(ydl_opts) as ydl:
         print(f"Content type: {response.headers.get('content-type')}")
         print(f"\nFirst 500 chars of content:\n{response.text[:500]}")
         
-        # Try parsing
+        # Parse directly with libxml2; recover=True tolerates YouTube's occasionally malformed XML
         print("\n--- Parsing with lxml ---")
-        soup = BeautifulSoup(response.content, 'lxml')
-        print(f"Soup type: {type(soup)}")
-        
-        # Try different tag names
-        for tag in ['text', 'p', 's']:
-            elements = soup.find_all(tag)
-            print(f"Found {len(elements)} <{tag}> elements")
-            if elements:
-                print(f"First element: {elements[0]}")
-                break
+        root = etree.fromstring(response.content, etree.XMLParser(recover=True))
+        if root is None:
+            print("Content is not XML")
+        else:
+            print(f"Root element: <{root.tag}>")
+            
+            # Try different tag names
+            for tag in ['text', 'p', 's']:
+                texts = root.xpath(f'//{tag}/text()')
+                print(f"Found {len(texts)} <{tag}> text nodes")
+                if texts:
+                    print(f"First text: {texts[0]}")
+                    break
@@ -1,63 +1,117 @@
 """Test scraping lyrics from YouTube Music page using Playwright"""
-from playwright.sync_api import sync_playwright
-import time
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+import os
 
 url = 'https://music.youtube.com/watch?v=kHvXvoXJu48'
+# DEBUG_BROWSER=1 shows the browser and waits before closing; otherwise run headless.
+# CHROME_HEADLESS_SHELL may point at a chrome-headless-shell binary, which starts faster
+# and uses far less memory than full Chromium
+debug_browser = os.environ.get('DEBUG_BROWSER') == '1'
+PROFILE_DIR = os.path.expanduser('~/.cache/wdtslm/chrome-profile')
+
+# Candidate selectors for the lyrics content
+LYRICS_SELECTORS = (
+    'ytmusic-description-shelf-renderer',
+    '[class*="description"]',
+    '[class*="lyrics"]',
+    'yt-formatted-string.description',
+)
 
 print(f"Opening: {url}")
 print("=" * 60)
 
 with sync_playwright() as p:
-    browser = p.chromium.launch(headless=False)  # Set to False to see what's happening
-    page = browser.new_page()
+    # A persistent profile keeps YouTube's cookie-consent choice between runs, so only
+    # the first run meets the consent interstitial
+    if debug_browser:
+        context = p.chromium.launch_persistent_context(PROFILE_DIR, headless=False)
+    else:
+        context = p.chromium.launch_persistent_context(
+            PROFILE_DIR,
+            headless=True,
+            executable_path=os.environ.get('CHROME_HEADLESS_SHELL') or None,
+            args=[
+                '--disable-gpu',
+                '--disable-dev-shm-usage',
+                '--disable-extensions',
+                '--blink-settings=imagesEnabled=false',
+            ],
+        )
+    page = context.new_page()
+    # Only the page's text is read: skip images, media, fonts and stylesheets entirely
+    blocked_types = {'image', 'media', 'font', 'stylesheet'}
+    page.route(
+        '**/*',
+        lambda route: route.abort() if route.request.resource_type in blocked_types else route.continue_(),
+    )
     
     try:
-        # Navigate to the page
-        page.goto(url, wait_until='networkidle', timeout=30000)
-        
-        # Wait a bit for dynamic content to load
-        time.sleep(3)
+        # Navigate to the page. YouTube Music keeps long-poll connections open, so
+        # 'networkidle' fires late or not at all; wait for the content we read instead
+        page.goto(url, wait_until='domcontentloaded', timeout=15000)
+        try:
+            page.wait_for_selector(
+                'ytmusic-description-shelf-renderer, [class*="lyrics"]',
+                state='attached',
+                timeout=10000,
+            )
+        except PlaywrightTimeoutError:
+            print("Lyrics container not found within 10 seconds, continuing anyway")
         
         # Look for lyrics tab/button
         print("Looking for LYRICS tab...")
         
         # Try to find and click the Lyrics tab
         try:
-            lyrics_tab = page.locator('text=LYRICS').first
+            # Role lookup on the tab strip instead of a text search over the whole page
+            lyrics_tab = page.get_by_role('tab', name='Lyrics')
             if lyrics_tab.is_visible():
                 print("Found LYRICS tab, clicking...")
                 lyrics_tab.click()
-                time.sleep(2)
+                # Wait until the shelf actually holds text, not just until it exists
+                page.wait_for_function(
+                    "() => { const el = document.querySelector('ytmusic-description-shelf-renderer');"
+                    " return el && el.innerText.length > 50; }",
+                    timeout=8000,
+                )
         except:
             print("Could not find or click LYRICS tab")
         
-        # Try different selectors for lyrics content
-        selectors = [
-            'ytmusic-description-shelf-renderer',
-            '[class*="description"]',
-            '[class*="lyrics"]',
-            'yt-formatted-string.description',
-        ]
+        # Query the selectors inside the page in one round-trip instead of a locator
+        # lookup plus inner_text() call per element; stop at the first selector whose
+        # elements hold real text, so later selectors are only tried when needed
+        matches = page.evaluate(
+            """sels => {
+                const out = [];
+                for (const s of sels) {
+                    const els = [...document.querySelectorAll(s)];
+                    const texts = els.slice(0, 3).map(e => e.innerText);
+                    out.push({count: els.length, texts});
+                    if (texts.some(t => t && t.length > 50)) break;
+                }
+                return out;
+            }""",
+            list(LYRICS_SELECTORS),
+        )
         
-        for selector in selectors:
+        for selector, match in zip(LYRICS_SELECTORS, matches):
             print(f"\nTrying selector: {selector}")
-            elements = page.locator(selector).all()
-            print(f"Found {len(elements)} elements")
+            print(f"Found {match['count']} elements")
             
-            for i, elem in enumerate(elements[:3]):  # Check first 3
-                try:
-                    text = elem.inner_text()
-                    if text and len(text) > 50:
-                        print(f"\nElement {i} text (first 200 chars):")
-                        print(text[:200])
-                        print(f"Total length: {len(text)}")
-                except:
-                    pass
+            for i, text in enumerate(match['texts']):  # First 3 only
+                if text and len(text) > 50:
+                    print(f"\nElement {i} text (first 200 chars):")
+                    print(text[:200])
+                    print(f"Total length: {len(text)}")
+        
+        if len(matches) < len(LYRICS_SELECTORS):
+            print(f"\nLyrics found with '{LYRICS_SELECTORS[len(matches) - 1]}', skipped remaining selectors")
         
         # Get the full page content to inspect
         print("\n\nPage title:", page.title())
         
-        input("\n\nPress Enter to close browser...")
+        if debug_browser:
+            input("\n\nPress Enter to close browser...")
         
     finally:
-        browser.close()
+        context.close()
@@ -2,15 +2,19 @@
 from scraper_v2 import get_lyrics_from_input
 
 url = 'https://music.youtube.com/watch?v=kHvXvoXJu48'
+# Anything shorter is a stub or an error page, not lyrics
+MIN_LYRICS_CHARS = 100
+
 print(f"Testing: {url}")
 print("=" * 60)
 
-result = get_lyrics_from_input(url)
+# get_lyrics_from_input returns (lyrics_text, status_message), like every other caller expects
+lyrics, status = get_lyrics_from_input(url)
+print(status)
 
-if result and len(result) > 100:
-    print(f"✅ SUCCESS! Got {len(result)} characters")
+if lyrics and len(lyrics) > MIN_LYRICS_CHARS:
+    print(f"✅ SUCCESS! Got {len(lyrics)} characters")
     print(f"\nFirst 500 characters:")
-    print(result[:500])
+    print(lyrics[:500])
 else:
     print(f"❌ FAILED - No lyrics found")
-    print(f"Result: {result}")
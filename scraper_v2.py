@@ -4,15 +4,197 @@ Uses multiple methods: yt-dlp for subtitles, Genius API for lyrics, Spotify API
 """
 from __future__ import annotations
 
+import html
+import importlib.util
+import io
+import json
 import logging
+import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from typing import Optional, Tuple
 from urllib.parse import parse_qs, urlparse
 
-logging.basicConfig(level=logging.INFO)
+from cache import CACHE_DB_PATH, LRUCache, PersistentLRUCache
+
 logger = logging.getLogger(__name__)
 
+# Optional sources, checked once without importing them (yt-dlp alone takes ~0.5s to
+# import); a missing package skips its source up front instead of failing per call
+HAS_YTDLP = importlib.util.find_spec("yt_dlp") is not None
+HAS_LYRICSGENIUS = importlib.util.find_spec("lyricsgenius") is not None
+HAS_SPOTIPY = importlib.util.find_spec("spotipy") is not None
+
+# Shared pool for racing lyric sources; bounds concurrent upstream requests across sessions
+_lyrics_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="lyrics")
+
+HTTP_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+HTTP_CACHE_PATH = ".http_cache"
+HTTP_CACHE_TTL_SECONDS = 86400
+YTDLP_CACHE_DIR = ".yt_dlp_cache"
+_WHITESPACE_RE = re.compile(r'\s+')
+# AZLyrics puts the lyrics in a class-less div right after this licensing comment
+_AZ_LYRICS_RE = re.compile(r'<!-- Usage of azlyrics\.com.*?-->(.*?)</div>', re.DOTALL)
+# Genius page header glued to the start of the lyrics: optional contributor count (and
+# translation links), then "<Song Title> Lyrics" up to the first section header
+_GENIUS_HEADER_RE = re.compile(r'^(?:\d+\s*Contributors?)?.*? Lyrics(?=\[|$)')
+_BR_RE = re.compile(r'<br\s*/?>\r?\n?', re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+# ASCII bytes that aren't [a-z0-9] after lowercasing, deleted in one bytes.translate pass
+_URL_UNSAFE_BYTES = bytes(b for b in range(128) if not chr(b).isalnum())
+# v= query parameter (in any position), youtu.be/, embed/, shorts/ and live/ URLs
+# (music.youtube.com included); YouTube IDs are 11 characters
+_VIDEO_ID_RE = re.compile(r'(?:[?&]v=|youtu\.be/|/embed/|/shorts/|/live/)([A-Za-z0-9_-]{11})')
+_VIDEO_ID_ONLY_RE = re.compile(r'[A-Za-z0-9_-]{11}')
+
+# Successful lookups are kept on disk for a week, so repeat lookups (and restarts) skip
+# the network entirely; failures aren't cached, so a transient error (rate limit,
+# timeout) doesn't stick
+LYRICS_CACHE_SIZE = 256
+LYRICS_CACHE_TTL_SECONDS = 7 * 86400
+_lyrics_results = PersistentLRUCache(LYRICS_CACHE_SIZE, CACHE_DB_PATH, "lyrics", ttl_seconds=LYRICS_CACHE_TTL_SECONDS)
+
+# Last subtitle URL seen per video, kept on disk so a repeat lookup (even after a restart)
+# can download captions directly without a yt-dlp extraction; videos known to have no
+# English captions are remembered for an hour so they aren't re-probed. YouTube signs
+# caption URLs for about six hours, so rows older than that are purged
+SUBTITLE_URL_TTL_SECONDS = 6 * 3600
+_subtitle_urls = PersistentLRUCache(256, CACHE_DB_PATH, "subtitle_urls", ttl_seconds=SUBTITLE_URL_TTL_SECONDS)
+_no_subtitles = LRUCache(256, ttl_seconds=3600)
+
+# AZLyrics URLs are derived from artist/title, so a pair that 404'd will 404 again;
+# remember misses on disk (for a week, in case the song is added) and skip the request
+AZ_MISSING_TTL_SECONDS = 7 * 86400
+_az_missing = PersistentLRUCache(1024, CACHE_DB_PATH, "azlyrics_missing", ttl_seconds=AZ_MISSING_TTL_SECONDS)
 
+# Prefer json3 (flat JSON, cheapest to parse), then srv3 (simple XML) or vtt
+SUBTITLE_FORMAT_PREFERENCE = ('json3', 'srv3', 'vtt', 'srv2', 'srv1')
+
+# Subtitle URLs in yt-dlp info are signed and expire after a few hours
+YTDLP_INFO_TTL_SECONDS = 3600
+# YouTube throttles with HTTP 429; back off 1s, 2s, 4s... (capped) before giving up
+YTDLP_MAX_ATTEMPTS = 4
+YTDLP_MAX_BACKOFF_SECONDS = 16
+
+# One YoutubeDL per thread: building one loads every extractor and sets up cookies/HTTP,
+# and instances aren't safe to share between threads
+_ytdlp_local = threading.local()
+
+
+@lru_cache(maxsize=None)
+def _http_session():
+    """
+    Shared HTTP session for scraping. With requests-cache installed, GET responses are
+    persisted to SQLite for a day (honoring Cache-Control/ETag), so Streamlit reruns and
+    repeat lookups don't re-hit upstream sites. Either way, connections are pooled and
+    kept alive per host, and transient failures are retried with backoff.
+    """
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    try:
+        import requests_cache
+        session = requests_cache.CachedSession(
+            HTTP_CACHE_PATH,
+            backend="sqlite",
+            expire_after=HTTP_CACHE_TTL_SECONDS,
+            allowable_methods=("GET", "HEAD"),
+            cache_control=True,
+        )
+    except ImportError:
+        import requests
+        logger.info("requests-cache not installed - scraper responses will not be cached")
+        session = requests.Session()
+    
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        # 429s are retried too, waiting as long as the server's Retry-After asks
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 502, 503, 504)),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = HTTP_USER_AGENT
+    return session
+
+
+def _ytdlp_info(video_id: str) -> dict:
+    """
+    yt-dlp metadata (title, uploader, subtitle tracks) for a video, fetched once per
+    video per TTL window and shared by the subtitle and metadata lookups.
+    """
+    return _ytdlp_info_cached(video_id, int(time.time() // YTDLP_INFO_TTL_SECONDS))
+
+
+@lru_cache(maxsize=128)
+def _ytdlp_info_cached(video_id: str, ttl_bucket: int) -> dict:
+    # ttl_bucket only varies the cache key, so entries expire with the TTL window
+    from yt_dlp.utils import DownloadError
+    
+    url = f"https://www.youtube.com/watch?v={video_id}"
+    for attempt in range(YTDLP_MAX_ATTEMPTS):
+        try:
+            # process=False skips format sorting/selection; subtitles and metadata are already there
+            return _youtube_dl().extract_info(url, download=False, process=False)
+        except DownloadError as e:
+            # Only throttling is transient; other errors (private, removed, ...) fail fast
+            if "429" not in str(e) or attempt == YTDLP_MAX_ATTEMPTS - 1:
+                raise
+            delay = min(2 ** attempt, YTDLP_MAX_BACKOFF_SECONDS)
+            logger.info(f"YouTube rate-limited {video_id}, retrying in {delay}s")
+            time.sleep(delay)
+
+
+def _youtube_dl():
+    """This thread's reusable YoutubeDL instance."""
+    ydl = getattr(_ytdlp_local, "ydl", None)
+    if ydl is None:
+        import yt_dlp
+        
+        ydl = yt_dlp.YoutubeDL({
+            'skip_download': True,
+            'quiet': True,
+            'no_warnings': True,
+            'cachedir': YTDLP_CACHE_DIR,
+            'noplaylist': True,
+            # Only titles and subtitle tracks are used: don't fetch the HLS/DASH format manifests
+            'extractor_args': {'youtube': {'skip': ['hls', 'dash']}},
+        })
+        _ytdlp_local.ydl = ydl
+    return ydl
+
+
+def extract_batch(video_ids: list[str], max_workers: int = 8) -> dict[str, dict]:
+    """
+    Fetch yt-dlp info for several videos concurrently, filling the shared info cache
+    so later subtitle/metadata lookups for them are cache hits.
+    
+    Args:
+        video_ids: YouTube video IDs
+        max_workers: Concurrent fetches
+        
+    Returns:
+        Dict of video_id -> info for the videos that could be fetched
+    """
+    video_ids = list(dict.fromkeys(video_ids))
+    if not video_ids:
+        return {}
+    
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(video_ids)), thread_name_prefix="ytdlp") as pool:
+        futures = {pool.submit(_ytdlp_info, video_id): video_id for video_id in video_ids}
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                logger.warning(f"yt-dlp error for {futures[future]}: {e}")
+    return results
+
+
+@lru_cache(maxsize=1024)
 def extract_video_id(url: str) -> Optional[str]:
     """
     Extract YouTube video ID from various URL formats.
@@ -21,25 +203,22 @@ def extract_video_id(url: str) -> Optional[str]:
     - youtube.com/watch?v=VIDEO_ID
     - youtu.be/VIDEO_ID
     - youtube.com/embed/VIDEO_ID
-    - music.youtube.com/watch?v=VIDEO_ID
+    - youtube.com/shorts/VIDEO_ID and youtube.com/live/VIDEO_ID
+    - music.youtube.com/watch?v=VIDEO_ID (v may follow other query parameters)
     """
-    patterns = [
-        r'(?:youtube\.com\/watch\?v=|youtu\.be\/|youtube\.com\/embed\/)([^&\n?#]+)',
-        r'music\.youtube\.com\/watch\?v=([^&\n?#]+)',
-    ]
+    match = _VIDEO_ID_RE.search(url)
+    if match:
+        return match.group(1)
     
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    
-    # Try parsing query parameters
+    # Slow path for other URL shapes: a v= parameter, else the last path segment
     try:
-        parsed = urlparse(url)
-        if 'youtube.com' in parsed.netloc or 'youtu.be' in parsed.netloc or 'music.youtube' in parsed.netloc:
-            query_params = parse_qs(parsed.query)
-            if 'v' in query_params:
-                return query_params['v'][0]
+        parsed = urlparse(url if '//' in url else f'https://{url}')
+        if 'youtube.com' in parsed.netloc or 'youtu.be' in parsed.netloc:
+            video_id = parse_qs(parsed.query).get('v', [None])[0]
+            if not video_id:
+                segment = parsed.path.rstrip('/').rsplit('/', 1)[-1]
+                video_id = segment if _VIDEO_ID_ONLY_RE.fullmatch(segment) else None
+            return video_id
     except Exception as e:
         logger.error(f"Error parsing URL: {e}")
     
@@ -97,13 +276,7 @@ def get_youtube_music_lyrics(url: str) -> Optional[str]:
         title, artist = get_youtube_metadata(video_id)
         if title:
             logger.info(f"YouTube Music: {artist} - {title}, searching lyrics...")
-            # Try Genius first
-            lyrics = search_genius_lyrics(title, artist or "")
-            if lyrics:
-                return lyrics
-            
-            # Try lyrics-extractor as fallback
-            lyrics = search_lyrics_extractor(title, artist or "")
+            lyrics, _ = search_lyrics(title, artist or "")
             if lyrics:
                 return lyrics
         
@@ -124,79 +297,85 @@ def get_youtube_subtitles_ytdlp(video_id: str) -> Optional[str]:
     Returns:
         Subtitle text or None
     """
+    if _no_subtitles.get(video_id):
+        logger.info(f"No subtitles for {video_id} (cached)")
+        return None
+    if not HAS_YTDLP:
+        logger.warning("yt-dlp not installed - skipping YouTube captions")
+        return None
     try:
-        import yt_dlp
+        info = _ytdlp_info(video_id)
+        
+        # Helper function to find preferred subtitle format
+        def get_preferred_subtitle_url(subs):
+            # One pass over the tracks, keeping the first URL per format
+            by_ext = {}
+            for sub in subs:
+                by_ext.setdefault(sub.get('ext'), sub.get('url'))
+            for fmt in SUBTITLE_FORMAT_PREFERENCE:
+                if by_ext.get(fmt):
+                    return by_ext[fmt]
+            # Fallback to first available
+            return subs[0]['url'] if subs else None
+        
+        # Try to get subtitles
+        if 'en' in (info.get('subtitles') or {}):
+            # Manual subtitles available
+            sub_url = get_preferred_subtitle_url(info['subtitles']['en'])
+            if sub_url:
+                logger.info(f"Found manual subtitles for {video_id}")
+                _subtitle_urls.put(video_id, sub_url)
+                return _download_subtitle(sub_url)
+        
+        elif 'en' in (info.get('automatic_captions') or {}):
+            # Auto-generated captions
+            sub_url = get_preferred_subtitle_url(info['automatic_captions']['en'])
+            if sub_url:
+                logger.info(f"Found auto-generated captions for {video_id}")
+                _subtitle_urls.put(video_id, sub_url)
+                return _download_subtitle(sub_url)
+        
+        logger.warning(f"No subtitles found for {video_id}")
+        _no_subtitles.put(video_id, True)
+        return None
         
-        ydl_opts = {
-            'skip_download': True,
-            'writesubtitles': True,
-            'writeautomaticsub': True,
-            'subtitleslangs': ['en'],
-            'quiet': True,
-            'no_warnings': True,
-        }
-        
-        url = f"https://www.youtube.com/watch?v={video_id}"
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            
-            # Helper function to find preferred subtitle format
-            def get_preferred_subtitle_url(subs):
-                # Prefer srv3 (simple XML) or vtt formats over json3
-                for fmt in ['srv3', 'vtt', 'srv2', 'srv1']:
-                    for sub in subs:
-                        if sub.get('ext') == fmt:
-                            return sub.get('url')
-                # Fallback to first available
-                return subs[0]['url'] if subs else None
-            
-            # Try to get subtitles
-            if 'subtitles' in info and 'en' in info['subtitles']:
-                # Manual subtitles available
-                sub_url = get_preferred_subtitle_url(info['subtitles']['en'])
-                if sub_url:
-                    logger.info(f"Found manual subtitles for {video_id}")
-                    return _download_subtitle(sub_url)
-            
-            elif 'automatic_captions' in info and 'en' in info['automatic_captions']:
-                # Auto-generated captions
-                sub_url = get_preferred_subtitle_url(info['automatic_captions']['en'])
-                if sub_url:
-                    logger.info(f"Found auto-generated captions for {video_id}")
-                    return _download_subtitle(sub_url)
-            
-            logger.warning(f"No subtitles found for {video_id}")
-            return None
-            
     except Exception as e:
         logger.error(f"yt-dlp error for {video_id}: {e}")
         return None
 
 
+def get_cached_subtitles(video_id: str) -> Optional[str]:
+    """
+    Captions via the subtitle URL remembered from an earlier lookup, skipping yt-dlp.
+    Returns None if there is no remembered URL, it has expired, or the download fails.
+    """
+    url = _subtitle_urls.get(video_id)
+    if not url:
+        return None
+    # Subtitle URLs are signed with an expiry timestamp
+    expire = parse_qs(urlparse(url).query).get('expire', ['0'])[0]
+    if expire.isdigit() and 0 < int(expire) < time.time():
+        _subtitle_urls.discard(video_id)
+        return None
+    return _download_subtitle(url)
+
+
 def _download_subtitle(url: str) -> Optional[str]:
-    """Download and parse subtitle file."""
+    """Download and parse a subtitle file (json3 or srv3 XML)."""
     try:
-        import requests
-        from bs4 import BeautifulSoup
-        import warnings
-        from bs4 import XMLParsedAsHTMLWarning
-        
-        # Suppress BeautifulSoup XML warning
-        warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
-        
-        response = requests.get(url, timeout=10)
+        response = _http_session().get(url, timeout=10)
         response.raise_for_status()
         
-        # Parse XML subtitles - YouTube uses <p> tags for text content
-        soup = BeautifulSoup(response.content, 'lxml')
-        texts = [p.get_text().strip() for p in soup.find_all('p')]
+        if response.content.lstrip()[:1] == b'{':
+            texts = _json3_texts(response.content)
+        else:
+            texts = _xml_texts(response.content)
         
         if texts:
             # Join with newlines to preserve line structure
             full_text = '\n'.join(texts)
             # Clean up excessive whitespace within lines only
-            lines = [re.sub(r'\s+', ' ', line).strip() for line in full_text.split('\n')]
+            lines = [_WHITESPACE_RE.sub(' ', line).strip() for line in full_text.split('\n')]
             # Remove empty lines
             lines = [line for line in lines if line]
             return '\n'.join(lines)
@@ -207,6 +386,31 @@ def _download_subtitle(url: str) -> Optional[str]:
         return None
 
 
+def _json3_texts(content: bytes) -> list[str]:
+    """Caption lines from a json3 subtitle file: one per event, joined from its text segments."""
+    texts = []
+    for event in json.loads(content).get('events', []):
+        text = ''.join(seg.get('utf8', '') for seg in event.get('segs') or []).strip()
+        if text:
+            texts.append(text)
+    return texts
+
+
+def _xml_texts(content: bytes) -> list[str]:
+    """Caption lines from an srv3 XML subtitle file."""
+    from lxml import etree
+    
+    # YouTube uses <p> tags for text content. Stream the <p> elements and clear each
+    # one after reading instead of building a full tree.
+    texts = []
+    for _, elem in etree.iterparse(io.BytesIO(content), events=('end',), tag='p', recover=True):
+        text = ''.join(elem.itertext()).strip()
+        if text:
+            texts.append(text)
+        elem.clear()
+    return texts
+
+
 def get_youtube_metadata(video_id: str) -> Tuple[Optional[str], Optional[str]]:
     """
     Get video title and channel from YouTube.
@@ -214,29 +418,31 @@ def get_youtube_metadata(video_id: str) -> Tuple[Optional[str], Optional[str]]:
     Returns:
         Tuple of (title, artist/channel)
     """
+    if not HAS_YTDLP:
+        logger.warning("yt-dlp not installed - can't read YouTube metadata")
+        return None, None
     try:
-        import yt_dlp
-        
-        ydl_opts = {
-            'skip_download': True,
-            'quiet': True,
-            'no_warnings': True,
-        }
+        info = _ytdlp_info(video_id)
+        title = info.get('title', '')
+        artist = info.get('uploader', '') or info.get('channel', '')
         
-        url = f"https://www.youtube.com/watch?v={video_id}"
+        return title, artist
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            title = info.get('title', '')
-            artist = info.get('uploader', '') or info.get('channel', '')
-            
-            return title, artist
-            
     except Exception as e:
         logger.error(f"Error getting YouTube metadata: {e}")
         return None, None
 
 
+@lru_cache(maxsize=4)
+def _genius_client(token: str):
+    """Genius client per API token, built once so its HTTP session and connections are reused."""
+    import lyricsgenius
+    
+    genius = lyricsgenius.Genius(token, timeout=15, retries=3, remove_section_headers=True)
+    genius.verbose = False
+    return genius
+
+
 def search_genius_lyrics(song_name: str, artist: str = "") -> Optional[str]:
     """
     Search Genius.com for lyrics.
@@ -249,10 +455,10 @@ def search_genius_lyrics(song_name: str, artist: str = "") -> Optional[str]:
     Returns:
         Lyrics text or None
     """
+    if not HAS_LYRICSGENIUS:
+        logger.info("lyricsgenius not installed - skipping Genius search")
+        return None
     try:
-        import lyricsgenius
-        import os
-        
         # Try to get Genius token from environment
         token = os.getenv('GENIUS_ACCESS_TOKEN')
         
@@ -261,9 +467,7 @@ def search_genius_lyrics(song_name: str, artist: str = "") -> Optional[str]:
             logger.info("No Genius API token - skipping Genius search")
             return None
         
-        genius = lyricsgenius.Genius(token, timeout=15, retries=3, remove_section_headers=True)
-        genius.verbose = False
-        genius.remove_section_headers = True
+        genius = _genius_client(token)
         
         search_query = f"{artist} {song_name}" if artist else song_name
         
@@ -271,7 +475,9 @@ def search_genius_lyrics(song_name: str, artist: str = "") -> Optional[str]:
         
         if song and song.lyrics:
             logger.info(f"Found lyrics on Genius for '{search_query}'")
-            return song.lyrics
+            # Drop the page header ("12 ContributorsSong Title Lyrics") from the first line
+            first_line, newline, rest = song.lyrics.partition('\n')
+            return _GENIUS_HEADER_RE.sub('', first_line, count=1) + newline + rest
         
         logger.warning(f"No lyrics found on Genius for '{search_query}'")
         return None
@@ -281,6 +487,11 @@ def search_genius_lyrics(song_name: str, artist: str = "") -> Optional[str]:
         return None
 
 
+def _clean_for_url(text: str) -> str:
+    """Lowercase and keep only ASCII letters and digits, as AZLyrics URLs do."""
+    return text.lower().encode('ascii', 'ignore').translate(None, _URL_UNSAFE_BYTES).decode('ascii')
+
+
 def search_lyrics_extractor(song_name: str, artist: str = "") -> Optional[str]:
     """
     Search for lyrics using direct web scraping from AZLyrics.
@@ -294,45 +505,34 @@ def search_lyrics_extractor(song_name: str, artist: str = "") -> Optional[str]:
         Lyrics text or None
     """
     try:
-        import requests
-        from bs4 import BeautifulSoup
-        import re
-        
         if not artist:
             logger.warning("AZLyrics scraping requires artist name")
             return None
         
-        # Clean artist and song names for URL
-        def clean_for_url(text):
-            # Remove special characters, keep only alphanumeric
-            text = re.sub(r'[^a-z0-9]', '', text.lower())
-            return text
-        
-        artist_clean = clean_for_url(artist)
-        song_clean = clean_for_url(song_name)
+        artist_clean = _clean_for_url(artist)
+        song_clean = _clean_for_url(song_name)
         
         # AZLyrics URL format: https://www.azlyrics.com/lyrics/artist/song.html
         url = f"https://www.azlyrics.com/lyrics/{artist_clean}/{song_clean}.html"
         
+        page_key = f"{artist_clean}/{song_clean}"
+        if _az_missing.get(page_key):
+            logger.debug(f"Skipping AZLyrics, {url} was not found recently")
+            return None
+        
         logger.info(f"Searching AZLyrics: {url}")
         
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
+        response = _http_session().get(url, timeout=10)
         
-        response = requests.get(url, headers=headers, timeout=10)
+        if response.status_code == 404:
+            _az_missing.put(page_key, "404")
         
         if response.status_code == 200:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # AZLyrics puts lyrics in a div without a class, after a comment
-            # Find all divs and look for the one with lyrics
-            divs = soup.find_all('div', class_=False, id=False)
-            
-            for div in divs:
-                text = div.get_text().strip()
-                # Lyrics section is usually quite long
-                if len(text) > 200 and '\n' in text:
+            # Cut the lyrics block out with one regex scan instead of building a DOM
+            match = _AZ_LYRICS_RE.search(response.text)
+            if match:
+                text = html.unescape(_TAG_RE.sub('', _BR_RE.sub('\n', match.group(1)))).strip()
+                if text:
                     logger.info(f"Found lyrics on AZLyrics ({len(text)} chars)")
                     return text
         
@@ -344,6 +544,29 @@ def search_lyrics_extractor(song_name: str, artist: str = "") -> Optional[str]:
         return None
 
 
+def search_lyrics(song_name: str, artist: str = "") -> Tuple[Optional[str], Optional[str]]:
+    """
+    Query Genius and AZLyrics concurrently and take the first non-empty result,
+    so a slow or failing source doesn't hold up the other.
+    
+    Args:
+        song_name: Song title
+        artist: Artist name (optional)
+        
+    Returns:
+        Tuple of (lyrics_text, source_name), or (None, None) if no source has them
+    """
+    sources = {
+        _lyrics_pool.submit(search_genius_lyrics, song_name, artist): "Genius",
+        _lyrics_pool.submit(search_lyrics_extractor, song_name, artist): "AZLyrics",
+    }
+    for future in as_completed(sources):
+        lyrics = future.result()
+        if lyrics:
+            return lyrics, sources[future]
+    return None, None
+
+
 def get_spotify_track_info(track_id: str) -> Tuple[Optional[str], Optional[str]]:
     """
     Get track name and artist from Spotify.
@@ -352,6 +575,9 @@ def get_spotify_track_info(track_id: str) -> Tuple[Optional[str], Optional[str]]
     Returns:
         Tuple of (track_name, artist_name)
     """
+    if not HAS_SPOTIPY:
+        logger.warning("spotipy not installed - can't read Spotify metadata")
+        return None, None
     try:
         import spotipy
         from spotipy.oauth2 import SpotifyClientCredentials
@@ -371,117 +597,200 @@ def get_spotify_track_info(track_id: str) -> Tuple[Optional[str], Optional[str]]
         return None, None
 
 
-def get_lyrics_from_input(user_input: str) -> Tuple[Optional[str], str]:
+def get_lyrics_batch(inputs: list[str], max_workers: int = 4) -> dict[str, Tuple[Optional[str], str]]:
+    """
+    Look up lyrics for several inputs concurrently; each lookup is network-bound.
+    
+    Args:
+        inputs: URLs or "Artist - Song Name" queries
+        max_workers: Concurrent lookups
+        
+    Returns:
+        Dict of input -> (lyrics_text, status_message), in input order
+    """
+    unique_inputs = list(dict.fromkeys(inputs))
+    if not unique_inputs:
+        return {}
+    
+    # Fetch yt-dlp info for the YouTube inputs that will need it (no cached result or
+    # subtitle URL) in one wider fan-out, so their lookups below start from cache hits
+    video_ids = []
+    for user_input in unique_inputs:
+        user_input = user_input.strip()
+        kind = classify_input(user_input)
+        if kind not in ("youtube", "youtube_music"):
+            continue
+        video_id = extract_video_id(user_input)
+        if not video_id or _subtitle_urls.get(video_id):
+            continue
+        if _lyrics_results.get(_lyrics_cache_key(user_input, kind)) is None:
+            video_ids.append(video_id)
+    if len(video_ids) > 1 and HAS_YTDLP:
+        extract_batch(video_ids)
+    
+    # A dedicated pool: lookups themselves fan out on _lyrics_pool, so running them
+    # there could leave every worker waiting on tasks queued behind it
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_inputs)), thread_name_prefix="lyrics-batch") as pool:
+        return dict(zip(unique_inputs, pool.map(get_lyrics_from_input, unique_inputs)))
+
+
+def classify_input(user_input: str) -> str:
+    """
+    Classify user input by source in one pass over the lowercased text.
+    
+    Returns:
+        "youtube_music", "youtube", "spotify" or "search"
+    """
+    text = user_input.lower()
+    if 'music.youtube.com' in text:
+        return "youtube_music"
+    if 'youtube.com' in text or 'youtu.be' in text:
+        return "youtube"
+    if 'spotify.com' in text or 'spotify:' in text:
+        return "spotify"
+    return "search"
+
+
+def get_lyrics_from_input(user_input: str, refresh: bool = False) -> Tuple[Optional[str], str]:
     """
     Main function to get lyrics from user input.
     Handles URLs (YouTube, YouTube Music, Spotify) or song name search.
+    Successful results are cached on disk per input for LYRICS_CACHE_TTL_SECONDS.
     
     Args:
         user_input: Either a URL or "Artist - Song Name" format
+        refresh: Look the input up again even if a cached result exists
         
     Returns:
         Tuple of (lyrics_text, status_message)
     """
     user_input = user_input.strip()
+    kind = classify_input(user_input)
+    cache_key = _lyrics_cache_key(user_input, kind)
     
-    # Check if input is a YouTube URL
-    if is_youtube_url(user_input):
-        # For YouTube Music URLs, try scraping lyrics from the page first
-        if is_youtube_music_url(user_input):
-            logger.info(f"Detected YouTube Music URL, trying to scrape lyrics from page...")
-            lyrics = get_youtube_music_lyrics(user_input)
-            
-            if lyrics:
-                return lyrics, "✅ Extracted lyrics from YouTube Music page"
-        
-        # Extract video ID for fallback methods
+    if not refresh:
+        cached = _lyrics_results.get(cache_key)
+        if cached is not None:
+            entry = json.loads(cached)
+            logger.info(f"Served lyrics for '{user_input}' from cache")
+            return entry["lyrics"], entry["status"]
+    
+    lyrics, status = _INPUT_HANDLERS[kind](user_input)
+    # A failed refresh (timeout, rate limit) leaves any earlier result in place
+    if lyrics:
+        _lyrics_results.put(cache_key, json.dumps({"lyrics": lyrics, "status": status}))
+    return lyrics, status
+
+
+def _lyrics_cache_key(user_input: str, kind: str) -> str:
+    """
+    Cache key for a lookup. Song searches are case/spacing-insensitive; YouTube links are
+    keyed by video ID (case-sensitive) so share links, timestamps etc. hit the same entry.
+    """
+    if kind == "search":
+        return "search:" + " ".join(user_input.lower().split())
+    if kind in ("youtube", "youtube_music"):
         video_id = extract_video_id(user_input)
-        if not video_id:
-            return None, "❌ Could not extract video ID from YouTube URL"
-        
-        logger.info(f"Processing YouTube video ID: {video_id}")
-        
-        # Try to get subtitles using yt-dlp
-        lyrics = get_youtube_subtitles_ytdlp(video_id)
-        
-        if lyrics:
-            return lyrics, f"✅ Extracted captions from YouTube video: {video_id}"
-        
-        # If no subtitles, try to get video metadata and search for lyrics
-        title, artist = get_youtube_metadata(video_id)
-        
-        if title:
-            logger.info(f"No captions found. Searching for lyrics: {artist} - {title}")
-            
-            # Try Genius first
-            lyrics = search_genius_lyrics(title, artist or "")
-            if lyrics:
-                return lyrics, f"✅ Found lyrics on Genius for: {artist} - {title}"
-            
-            # Try lyrics-extractor as fallback
-            lyrics = search_lyrics_extractor(title, artist or "")
-            if lyrics:
-                return lyrics, f"✅ Found lyrics for: {artist} - {title}"
-        
-        return None, f"❌ No captions or lyrics found for video {video_id}"
+        if video_id:
+            return f"{kind}:{video_id}"
+    return f"{kind}:{user_input}"
+
+
+def _lyrics_from_youtube_music(user_input: str) -> Tuple[Optional[str], str]:
+    # For YouTube Music URLs, try scraping lyrics from the page first
+    logger.info(f"Detected YouTube Music URL, trying to scrape lyrics from page...")
+    lyrics = get_youtube_music_lyrics(user_input)
     
-    # Check if input is a Spotify URL
-    elif is_spotify_url(user_input):
-        track_id = extract_spotify_track_id(user_input)
-        
-        if not track_id:
-            return None, "❌ Could not extract track ID from Spotify URL"
-        
-        logger.info(f"Processing Spotify track ID: {track_id}")
-        
-        # Get track metadata from Spotify (if available)
-        track_name, artist_name = get_spotify_track_info(track_id)
-        
-        if track_name:
-            logger.info(f"Found Spotify track: {artist_name} - {track_name}")
-            
-            # Search for lyrics using open-source methods
-            lyrics = search_genius_lyrics(track_name, artist_name or "")
-            if lyrics:
-                return lyrics, f"✅ Found lyrics for: {artist_name} - {track_name}"
-            
-            lyrics = search_lyrics_extractor(track_name, artist_name or "")
-            if lyrics:
-                return lyrics, f"✅ Found lyrics for: {artist_name} - {track_name}"
-            
-            # Fallback to AZLyrics direct search (using search_lyrics_extractor which scrapes AZLyrics)
-            # Note: search_lyrics_extractor already scrapes AZLyrics, so we just return failure if it fails
-            return None, f"❌ Could not find lyrics for: {artist_name} - {track_name}"
-        
-        return None, "❌ Could not get track info from Spotify (check credentials)"
+    if lyrics:
+        return lyrics, "✅ Extracted lyrics from YouTube Music page"
+    return _lyrics_from_youtube(user_input)
+
+
+def _lyrics_from_youtube(user_input: str) -> Tuple[Optional[str], str]:
+    # Extract video ID for fallback methods
+    video_id = extract_video_id(user_input)
+    if not video_id:
+        return None, "❌ Could not extract video ID from YouTube URL"
     
-    # Assume it's a song name/artist search
-    else:
-        # Try to parse "Artist - Song Name" format
-        if ' - ' in user_input:
-            parts = user_input.split(' - ', 1)
-            artist = parts[0].strip()
-            song_name = parts[1].strip()
-        else:
-            artist = ""
-            song_name = user_input
-        
-        logger.info(f"Searching for lyrics: {artist} - {song_name}")
-        
-        # Try Genius first
-        lyrics = search_genius_lyrics(song_name, artist)
-        if lyrics:
-            return lyrics, f"✅ Found lyrics on Genius for: {user_input}"
+    logger.info(f"Processing YouTube video ID: {video_id}")
+    
+    lyrics = get_cached_subtitles(video_id)
+    if lyrics:
+        return lyrics, f"✅ Extracted captions from YouTube video: {video_id}"
+    
+    # One yt-dlp fetch provides both the title and the subtitle tracks; then download
+    # the captions and search lyric sites concurrently instead of one after the other
+    title, artist = get_youtube_metadata(video_id)
+    subtitles = _lyrics_pool.submit(get_youtube_subtitles_ytdlp, video_id)
+    found, source = search_lyrics(title, artist or "") if title else (None, None)
+    
+    # Captions win when present; lyric sites are the fallback
+    lyrics = subtitles.result()
+    if lyrics:
+        return lyrics, f"✅ Extracted captions from YouTube video: {video_id}"
+    
+    if found:
+        logger.info(f"No captions found. Using lyrics for: {artist} - {title}")
+        return found, f"✅ Found lyrics on {source} for: {artist} - {title}"
+    
+    return None, f"❌ No captions or lyrics found for video {video_id}"
+
+
+def _lyrics_from_spotify(user_input: str) -> Tuple[Optional[str], str]:
+    track_id = extract_spotify_track_id(user_input)
+    
+    if not track_id:
+        return None, "❌ Could not extract track ID from Spotify URL"
+    
+    logger.info(f"Processing Spotify track ID: {track_id}")
+    
+    # Get track metadata from Spotify (if available)
+    track_name, artist_name = get_spotify_track_info(track_id)
+    
+    if track_name:
+        logger.info(f"Found Spotify track: {artist_name} - {track_name}")
         
-        # Try AZLyrics as fallback
-        lyrics = search_lyrics_extractor(song_name, artist)
+        # Search for lyrics using open-source methods
+        lyrics, source = search_lyrics(track_name, artist_name or "")
         if lyrics:
-            return lyrics, f"✅ Found lyrics for: {user_input}"
+            return lyrics, f"✅ Found lyrics on {source} for: {artist_name} - {track_name}"
         
-        return None, f"❌ Could not find lyrics for '{user_input}'. Try being more specific with 'Artist - Song Name' format."
+        return None, f"❌ Could not find lyrics for: {artist_name} - {track_name}"
+    
+    return None, "❌ Could not get track info from Spotify (check credentials)"
+
+
+def _lyrics_from_search(user_input: str) -> Tuple[Optional[str], str]:
+    # Try to parse "Artist - Song Name" format
+    artist, separator, song_name = user_input.partition(' - ')
+    if separator:
+        artist = artist.strip()
+        song_name = song_name.strip()
+    else:
+        artist = ""
+        song_name = user_input
+    
+    logger.info(f"Searching for lyrics: {artist} - {song_name}")
+    
+    lyrics, source = search_lyrics(song_name, artist)
+    if lyrics:
+        return lyrics, f"✅ Found lyrics on {source} for: {user_input}"
+    
+    return None, f"❌ Could not find lyrics for '{user_input}'. Try being more specific with 'Artist - Song Name' format."
+
+
+_INPUT_HANDLERS = {
+    "youtube_music": _lyrics_from_youtube_music,
+    "youtube": _lyrics_from_youtube,
+    "spotify": _lyrics_from_spotify,
+    "search": _lyrics_from_search,
+}
 
 
 if __name__ == "__main__":
+    from logging_config import configure
+    
+    configure()
     # Test
     test_inputs = [
         "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
@@ -489,11 +798,14 @@ if __name__ == "__main__":
         "Radiohead - Karma Police",
     ]
     
+    # Look every input up concurrently, then report in order
+    results = get_lyrics_batch(test_inputs)
+    
     for inp in test_inputs:
         print(f"\n{'='*60}")
         print(f"Testing: {inp}")
         print('='*60)
-        lyrics, status = get_lyrics_from_input(inp)
+        lyrics, status = results[inp]
         print(status)
         if lyrics:
             print(f"Got {len(lyrics)} characters")
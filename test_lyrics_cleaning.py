@@ -0,0 +1,37 @@
+"""Tests for stripping scraper noise from lyrics"""
+import pytest
+
+from scraper_v2 import _GENIUS_HEADER_RE
+
+
+def _clean_lyrics(text: str) -> str:
+    app = pytest.importorskip("app")
+    return app._clean_lyrics(text)
+
+
+def test_recommendation_banner_glued_to_lyric_keeps_the_lyric():
+    lyrics = "Is this the real life?\nYou might also likeCaught in a landslide\nNo escape from reality"
+    assert _clean_lyrics(lyrics) == "Is this the real life?\nCaught in a landslide\nNo escape from reality"
+
+
+def test_lyric_lines_ending_in_lyrics_are_kept():
+    lyrics = "Song Title Lyrics\nI sing these lyrics"
+    assert _clean_lyrics(lyrics) == lyrics
+
+
+def test_contributors_and_embed_are_stripped():
+    lyrics = "12 Contributors\nTicking away\nThe moments that make up a dull day3Embed"
+    assert _clean_lyrics(lyrics) == "Ticking away\nThe moments that make up a dull day"
+
+
+@pytest.mark.parametrize(
+    "first_line, expected",
+    [
+        ("12 ContributorsTime Lyrics[Intro]", "[Intro]"),
+        ("Time Lyrics", ""),
+        ("3 ContributorsTranslationsEspañolBohemian Rhapsody Lyrics[Intro]", "[Intro]"),
+        ("I sing these lyrics", "I sing these lyrics"),
+    ],
+)
+def test_genius_header(first_line, expected):
+    assert _GENIUS_HEADER_RE.sub("", first_line, count=1) == expected